@@ -9,22 +9,34 @@
 - Stuart Russel, Peter Norvig, *Artificial Intelligence: A Modern Approach* [3th edition]
 """
 
-from queue import SimpleQueue, LifoQueue, PriorityQueue
+import heapq
+import json
+import sys
+import time
+from collections import Counter, deque
+from itertools import count
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows: the peak RSS is not measured
+    resource = None
 
 
 class Node:
+    __slots__ = ('state', 'parent', 'action_from_parent', 'path_cost', 'depth')
+
     def __init__(self, state, parent=None, action_from_parent=None, path_cost=0):
         """
         Create a search Node, derived from a parent by an action.
-        - tree_search Node -> ignore if already visited
-        - graph_search Node -> check if already visited
+        - Nodes only keep a pointer to their parent: the path is rebuilt when needed
+        - graph_search keeps track of the reached states in a separate table (see `SearchProblem.state_key`)
         """
         self.state = state
         self.parent = parent
         self.action_from_parent = action_from_parent
         self.path_cost = path_cost
         self.depth = 0 if parent is None else parent.depth + 1
-        self.is_visited = False
 
     def __lt__(self, other):
         """Return `True` if the path cost of the Node is less than the path cost of the other Node."""
@@ -58,16 +70,51 @@ class SearchProblem:
 
     def expand(self, node):
         """Return the `list` of successors Nodes of the given Node."""
-        successors = []
-        for action in self.actions(node.state):
-            new_state = self.apply_action(node.state, action)
-            new_node = Node(new_state, node, action, node.path_cost + self.action_cost(node.state, action, new_state))
-            successors.append(new_node)
-        return successors
+        return [self.child_node(node, action) for action in self.actions(node.state)]
+
+    def child_node(self, node, action):
+        """Return the successor Node of the given Node obtained by executing the given action."""
+        new_state = self.apply_action(node.state, action)
+        return Node(new_state, node, action, node.path_cost + self.action_cost(node.state, action, new_state))
+
+    def reverse_actions(self, state):
+        """
+        Return the `list` of (action, previous state) pairs such that executing the action in the previous state
+        leads to the given state, used by bidirectional search to move backward from the goal.
+        - The default method assumes that actions are reversible: the previous states are the ones reached from
+          the given state, and the action leading back is found among their actions. Override it if the problem
+          is not reversible, or if the inverse of an action is known (it's faster).
+        """
+        pairs = []
+        for action in self.actions(state):
+            previous_state = self.apply_action(state, action)
+            for reverse_action in self.actions(previous_state):
+                if self.apply_action(previous_state, reverse_action) == state:
+                    pairs.append((reverse_action, previous_state))
+                    break
+        return pairs
+
+    def reverse_expand(self, node):
+        """
+        Return the `list` of predecessors Nodes of the given Node, with the given Node as parent.
+        - `action_from_parent` is the action that leads from the predecessor to the given Node, and
+          `path_cost` is the cost from the predecessor to the goal
+        """
+        return [
+            Node(previous_state, node, action, node.path_cost + self.action_cost(previous_state, action, node.state))
+            for action, previous_state in self.reverse_actions(node.state)
+        ]
 
     def is_goal(self, state):
         """Return `True` if the given state is a goal state, `False` otherwise."""
-        return state == self.goal
+        return state == self.goal_state
+
+    def state_key(self, state):
+        """
+        Return a hashable key identifying the given state, used by graph_search to detect already reached states.
+        - The default method returns the state itself: override it if states are not hashable (e.g., sets).
+        """
+        return state
 
     def h(self, node):
         """
@@ -85,8 +132,227 @@ class SearchProblem:
         return path[::-1]
 
 
+class PriorityFrontier:
+    """
+    Priority frontier for single-threaded search, implemented by a `heapq`.
+    - ties are broken by a monotonic counter (first in, first out), Nodes are never compared
+    - decrease-key: pushing a Node with the `key` of a state already in the frontier replaces the old entry,
+      which is marked as removed and skipped when popped
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = count()
+        self._size = 0
+        self._removed = 0
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def push(self, node, priority, key=None):
+        """Add the given Node, return `True` if it replaced the entry of a previous Node with the same `key`."""
+        replaced = False
+        if key is not None:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                old[2] = None
+                self._size -= 1
+                self._removed += 1
+                replaced = True
+        entry = [priority, next(self._counter), node, key]
+        if key is not None:
+            self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._size += 1
+        if self._removed > 64 and self._removed > self._size:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+            self._removed = 0
+        return replaced
+
+    def pop(self):
+        while True:
+            _, _, node, key = heapq.heappop(self._heap)
+            if node is not None:
+                break
+            self._removed -= 1
+        if key is not None:
+            del self._entries[key]
+        self._size -= 1
+        return node
+
+    def min_priority(self):
+        """Return the priority of the Node that would be popped (the frontier must not be empty)."""
+        while self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+            self._removed -= 1
+        return self._heap[0][0]
+
+
+class ProfiledProblem:
+    """
+    Wrapper of a SearchProblem measuring the time spent generating successors and computing the heuristic.
+    - used by `SearchStrategy` when `profile` is `True`, any other attribute is taken from the wrapped problem
+    - `branching` and `depth` are histograms of the number of successors and of the depth of the expanded Nodes
+    - SMA* generates one successor at a time: `depth` counts the successors generated from each depth, and
+      `branching` the number of actions of the Nodes brought into memory
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.time_expand = 0.0
+        self.time_h = 0.0
+        self.generated = 0
+        self.branching = Counter()
+        self.depth = Counter()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def expand(self, node):
+        return self._expand(self.problem.expand, node)
+
+    def reverse_expand(self, node):
+        return self._expand(self.problem.reverse_expand, node)
+
+    def _expand(self, expand, node):
+        start = time.perf_counter()
+        successors = expand(node)
+        self.time_expand += time.perf_counter() - start
+        self.generated += len(successors)
+        self.branching[len(successors)] += 1
+        self.depth[node.depth] += 1
+        return successors
+
+    def actions(self, state):
+        start = time.perf_counter()
+        actions = self.problem.actions(state)
+        self.time_expand += time.perf_counter() - start
+        self.branching[len(actions)] += 1
+        return actions
+
+    def child_node(self, node, action):
+        start = time.perf_counter()
+        child = self.problem.child_node(node, action)
+        self.time_expand += time.perf_counter() - start
+        self.generated += 1
+        self.depth[node.depth] += 1
+        return child
+
+    def h(self, node):
+        start = time.perf_counter()
+        value = self.problem.h(node)
+        self.time_h += time.perf_counter() - start
+        return value
+
+
+class SearchMetrics:
+    """
+    Metrics of a single run of a `SearchStrategy`, see `SearchStrategy.metrics`.
+    - the time breakdown, the histograms and the duplicate rate are `None` unless the strategy is profiled
+    - `time_frontier` is the rest of the search: frontier operations and bookkeeping of the reached states
+    - `peak_rss` is the peak resident set size of the whole process in bytes (`None` if not available)
+    """
+
+    def __init__(self, strategy, solution, elapsed, profiled=None):
+        self.search_type = strategy.search_type
+        self.strategy_name = strategy.strategy_name
+        self.solved = solution is not None
+        self.path_cost = solution.path_cost if solution is not None else None
+        self.solution_depth = solution.depth if solution is not None else None
+        self.steps = strategy.steps
+        self.max_frontier_size = strategy.max_frontier_size
+        self.peak_nodes = strategy.peak_nodes
+        self.pruned = strategy.pruned
+        self.elapsed = elapsed
+        self.expansions_per_second = strategy.steps / elapsed if elapsed > 0 else None
+        self.generated = None
+        self.duplicate_rate = None
+        self.time_expand = None
+        self.time_h = None
+        self.time_frontier = None
+        self.branching = None
+        self.depth = None
+        if profiled is not None:
+            self.generated = profiled.generated
+            self.duplicate_rate = strategy.pruned / profiled.generated if profiled.generated else 0.0
+            self.time_expand = profiled.time_expand
+            self.time_h = profiled.time_h
+            self.time_frontier = max(0.0, elapsed - profiled.time_expand - profiled.time_h)
+            self.branching = dict(sorted(profiled.branching.items()))
+            self.depth = dict(sorted(profiled.depth.items()))
+        self.peak_rss = None
+        if resource is not None:
+            # kilobytes on Linux, bytes on macOS
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak_rss = rss if sys.platform == 'darwin' else rss * 1024
+
+    def mean_branching(self):
+        """Return the average number of successors of the expanded Nodes (`None` unless profiled)."""
+        if not self.branching:
+            return None
+        return sum(b * n for b, n in self.branching.items()) / sum(self.branching.values())
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+class JsonLinesExporter:
+    """
+    Hook appending the `SearchMetrics` of each run to a file, one JSON object per line.
+    - extra keyword arguments are added to every record (e.g., the instance or the heuristic being compared)
+    """
+
+    def __init__(self, path, **extra):
+        self.path = path
+        self.extra = extra
+
+    def __call__(self, metrics):
+        with open(self.path, 'a') as file:
+            file.write(json.dumps({**self.extra, **metrics.to_dict()}) + '\n')
+
+
+class BoundedNode:
+    """
+    Node kept in memory by the simplified memory-bounded A* (SMA*).
+    - successors are generated one at a time, and the worst ones are forgotten when the memory is full
+    - a forgotten successor is remembered by its parent only through its (backed-up) f-cost
+    """
+
+    __slots__ = ('node', 'key', 'f', 'parent', 'index', 'actions', 'next_action', 'children', 'forgotten', 'is_goal', 'version')
+
+    def __init__(self, node, key, f, parent, index, actions, is_goal):
+        self.node = node
+        self.key = key
+        self.f = f
+        self.parent = parent
+        # index of the action of the parent that generated this Node
+        self.index = index
+        self.actions = actions
+        # actions[next_action:] have never been tried
+        self.next_action = 0
+        # index of the action -> successor BoundedNode in memory
+        self.children = {}
+        # index of the action -> f-cost of the forgotten successor
+        self.forgotten = {}
+        self.is_goal = is_goal
+        # incremented at each change, to invalidate the entries in the heaps (-1 if the Node has been forgotten)
+        self.version = 0
+
+    def is_open(self):
+        """Return `True` if the Node can be selected: it is a goal, or it has successors not in memory."""
+        return self.is_goal or self.next_action < len(self.actions) or bool(self.forgotten)
+
+
 class SearchStrategy:
-    def __init__(self, search_type, strategy_name, limit=None):
+    def __init__(self, search_type, strategy_name, limit=None, memory_limit=None, profile=False, hooks=None):
         """
         1. Select a search type by name.
         - `tree_search`
@@ -101,25 +367,50 @@ class SearchStrategy:
         - `depth_limited`
         - `iterative_deepening`
         - `bidirectional`
+        - `bidirectional_uniform_cost`
 
         INFORMED:
         - `greedy_best_first`
         - `a_star`
 
+        MEMORY-BOUNDED INFORMED:
+        - `ida_star`
+        - `recursive_best_first`
+        - `sma_star`
+
         3. Optionally select a limit, the maximum depth of the search tree (used only by depth_limited search strategy).
+
+        4. Optionally select a memory limit, the maximum number of Nodes kept in memory (required by sma_star,
+        ida_star and recursive_best_first give up the paths that would exceed it).
+
+        5. Optionally profile the search, measuring the time spent in `expand` and `h` (it slows the search down),
+        and add hooks, callables receiving the `SearchMetrics` at the end of each search (e.g., a `JsonLinesExporter`).
         ---
         `steps` and `max_frontier_size` are variables used to evaluate the performance of the search strategy.
+        `pruned` counts the Nodes discarded by graph_search because their state had already been reached
+        with a path that is not worse.
+        `peak_nodes` is the maximum number of Nodes simultaneously kept in memory by the memory-bounded strategies.
+        `metrics` collects all of them, and more, at the end of each search (see `SearchMetrics`).
         """
         self.search_type = search_type
         self.strategy_name = strategy_name
         self.limit = limit
+        self.memory_limit = memory_limit
         self.steps = 0
         self.max_frontier_size = 0
+        self.pruned = 0
+        self.peak_nodes = 0
+        self.profile = profile
+        self.hooks = list(hooks) if hooks is not None else []
+        self.metrics = None
 
     def reset(self):
         """Reset the variables used to evaluate the performance of the search strategy."""
         self.steps = 0
         self.max_frontier_size = 0
+        self.pruned = 0
+        self.peak_nodes = 0
+        self.metrics = None
 
     def print_solution(self, problem, solution):
         """
@@ -130,6 +421,8 @@ class SearchStrategy:
         print('Strategy:', self.strategy_name)
         if self.limit is not None and self.strategy_name == 'depth_limited':
             print('Limit:', self.limit)
+        if self.memory_limit is not None and self.strategy_name in ('ida_star', 'recursive_best_first', 'sma_star'):
+            print('Memory limit:', self.memory_limit)
         print('----------------------')
 
         if solution is None:
@@ -139,14 +432,75 @@ class SearchStrategy:
             print('Path:', problem.retrieve_path(solution))
             print('Path cost:', solution.path_cost)
             print('Number of steps:', self.steps)
-            print('Max frontier size:', self.max_frontier_size)
+            if self.strategy_name in ('ida_star', 'recursive_best_first', 'sma_star'):
+                print('Peak Nodes in memory:', self.peak_nodes)
+            else:
+                print('Max frontier size:', self.max_frontier_size)
+            if self.search_type == 'graph_search':
+                print('Duplicates pruned:', self.pruned)
+            if self.metrics is not None and self.metrics.expansions_per_second is not None:
+                print(f'Expansions per second: {self.metrics.expansions_per_second:,.0f}')
+
+    def _reach(self, node, key, reached, cost=None):
+        """
+        Return `True` if the given Node must be added to the frontier.
+        - graph_search: `reached` maps the key of each state reached so far to its best Node (lowest `cost`),
+          a Node is added only if its state is new or it is reached through a better path
+        """
+        if key is None:
+            return True
+        best = reached.get(key)
+        if best is not None and (cost(best) <= cost(node) if cost else best.path_cost <= node.path_cost):
+            self.pruned += 1
+            return False
+        reached[key] = node
+        return True
+
+    def _is_stale(self, node, key, reached):
+        """Return `True` if a better path to the state of the given Node has been found since it was added to the frontier."""
+        if key is not None and reached[key] is not node:
+            self.pruned += 1
+            return True
+        return False
+
+    def _best_first_search(self, problem, search_type, f):
+        """Generic best-first search: the frontier is a `PriorityFrontier` ordered by `f(node)`."""
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        reached = {}
+        frontier = PriorityFrontier()
+        root = Node(problem.initial_state)
+        key = state_key(root.state) if graph else None
+        self._reach(root, key, reached)
+        frontier.push(root, f(root), key)
+        while frontier:
+            node = frontier.pop()
+            if problem.is_goal(node.state):
+                return node
+            self.steps += 1
+            self.max_frontier_size = max(self.max_frontier_size, len(frontier))
+            for child in problem.expand(node):
+                key = state_key(child.state) if graph else None
+                if self._reach(child, key, reached) and frontier.push(child, f(child), key):
+                    # decrease-key: the worse Node is dropped from the frontier
+                    self.pruned += 1
+        return None
 
     def search(self, problem):
         """
         Return the solution Node of the given problem using the selected search strategy or None if no solution is found.
+        - the metrics of the search are stored in `metrics` and passed to the hooks
         """
         self.reset()
-
+        profiled = ProfiledProblem(problem) if self.profile else None
+        start = time.perf_counter()
+        solution = self._search(profiled if profiled is not None else problem)
+        self.metrics = SearchMetrics(self, solution, time.perf_counter() - start, profiled)
+        for hook in self.hooks:
+            hook(self.metrics)
+        return solution
+
+    def _search(self, problem):
+        """Run the selected search strategy."""
         if self.strategy_name == 'breadth_first':
             return SearchStrategy.breadth_first_search(self, problem, self.search_type)
         elif self.strategy_name == 'depth_first':
@@ -161,10 +515,20 @@ class SearchStrategy:
             return SearchStrategy.iterative_deepening_search(self, problem, self.search_type)
         elif self.strategy_name == 'bidirectional':
             return SearchStrategy.bidirectional_search(self, problem)
+        elif self.strategy_name == 'bidirectional_uniform_cost':
+            return SearchStrategy.bidirectional_uniform_cost_search(self, problem)
         elif self.strategy_name == 'greedy_best_first':
             return SearchStrategy.greedy_best_first_search(self, problem, self.search_type)
         elif self.strategy_name == 'a_star':
             return SearchStrategy.a_star_search(self, problem, self.search_type)
+        elif self.strategy_name == 'ida_star':
+            return SearchStrategy.ida_star_search(self, problem, self.search_type)
+        elif self.strategy_name == 'recursive_best_first':
+            return SearchStrategy.recursive_best_first_search(self, problem, self.search_type)
+        elif self.strategy_name == 'sma_star':
+            if self.memory_limit is None:
+                raise ValueError('No memory limit given.')
+            return SearchStrategy.sma_star_search(self, problem, self.memory_limit, self.search_type)
         else:
             raise ValueError('Invalid search strategy name.')
 
@@ -172,90 +536,101 @@ class SearchStrategy:
         """
         Return the solution Node of the given problem using the breadth-first search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `FIFO queue`
+        - frontier: implemented by a `deque` (FIFO)
         """
-        frontier = SimpleQueue()
-        frontier.put(Node(problem.initial_state))
-        while not frontier.empty():
-            node = frontier.get()
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        # states are never re-opened (the first path found is the shortest one), no stale Nodes in the frontier
+        first = lambda n: 0
+        reached = {}
+        frontier = deque()
+        root = Node(problem.initial_state)
+        key = state_key(root.state) if graph else None
+        self._reach(root, key, reached, first)
+        frontier.append(root)
+        while frontier:
+            node = frontier.popleft()
             if problem.is_goal(node.state):
                 return node
             self.steps += 1
-            self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
+            self.max_frontier_size = max(self.max_frontier_size, len(frontier))
             for child in problem.expand(node):
-                if search_type == 'tree_search' or not child.is_visited:
-                    frontier.put(child)
-                    self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
-                    child.is_visited = True
+                key = state_key(child.state) if graph else None
+                if self._reach(child, key, reached, first):
+                    frontier.append(child)
+                    self.max_frontier_size = max(self.max_frontier_size, len(frontier))
         return None
 
     def depth_first_search(self, problem, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the depth-first search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `LIFO queue`
+        - frontier: implemented by a `list` (LIFO)
         """
-        frontier = LifoQueue()
-        frontier.put(Node(problem.initial_state))
-        while not frontier.empty():
-            node = frontier.get()
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        # states are never re-opened, or depth-first search would re-explore them over and over
+        first = lambda n: 0
+        reached = {}
+        frontier = []
+        root = Node(problem.initial_state)
+        key = state_key(root.state) if graph else None
+        self._reach(root, key, reached, first)
+        frontier.append(root)
+        while frontier:
+            node = frontier.pop()
             if problem.is_goal(node.state):
                 return node
             self.steps += 1
-            self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
+            self.max_frontier_size = max(self.max_frontier_size, len(frontier))
             for child in problem.expand(node):
-                if search_type == 'tree_search' or not child.is_visited:
-                    frontier.put(child)
-                    child.is_visited = True
+                key = state_key(child.state) if graph else None
+                if self._reach(child, key, reached, first):
+                    frontier.append(child)
         return None
 
     def uniform_cost_search(self, problem, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the uniform-cost search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `Priority queue` with path cost as priority
+        - frontier: implemented by a `PriorityFrontier` with path cost as priority
         """
-        frontier = PriorityQueue()
-        frontier.put((0, Node(problem.initial_state)))
-        while not frontier.empty():
-            node = frontier.get()[1]
-            if problem.is_goal(node.state):
-                return node
-            self.steps += 1
-            self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
-            for child in problem.expand(node):
-                if search_type == 'tree_search' or not child.is_visited:
-                    frontier.put((child.path_cost, child))
-                    child.is_visited = True
-        return None
+        return self._best_first_search(problem, search_type, lambda n: n.path_cost)
 
     def depth_limited_search(self, problem, limit, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the depth-limited search algorithm or None if no solution is found within the given limit.
         - limit: the maximum depth of the search tree
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `LIFO queue`
+        - frontier: implemented by a `list` (LIFO)
         """
-        frontier = LifoQueue()
-        frontier.put(Node(problem.initial_state))
-        while not frontier.empty():
-            node = frontier.get()
+        # with a depth limit, a state reached again at a lower depth must be explored again
+        depth = lambda n: n.depth
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        reached = {}
+        frontier = []
+        root = Node(problem.initial_state)
+        key = state_key(root.state) if graph else None
+        self._reach(root, key, reached, depth)
+        frontier.append((root, key))
+        while frontier:
+            node, key = frontier.pop()
+            if self._is_stale(node, key, reached):
+                continue
             if problem.is_goal(node.state):
                 return node
             if node.depth < limit:
                 self.steps += 1
-                self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
+                self.max_frontier_size = max(self.max_frontier_size, len(frontier))
                 for child in problem.expand(node):
-                    if search_type == 'tree_search' or not child.is_visited:
-                        frontier.put(child)
-                        child.is_visited = True
+                    key = state_key(child.state) if graph else None
+                    if self._reach(child, key, reached, depth):
+                        frontier.append((child, key))
         return None
 
     def iterative_deepening_search(self, problem, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the iterative deepening search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `LIFO queue`
+        - frontier: implemented by a `list` (LIFO)
         """
         limit = 0
         while True:
@@ -266,64 +641,332 @@ class SearchStrategy:
 
     def bidirectional_search(self, problem):
         """
-        Return the solution Node of the given problem using the bidirectional search algorithm or None if no solution is found.
-        - frontiers: implemented by a `FIFO queue`
-        """
-        frontier_start = SimpleQueue()
-        frontier_start.put(Node(problem.initial_state))
-
-        frontier_goal = SimpleQueue()
-        frontier_goal.put(Node(problem.goal_state))
-
-        while not frontier_start.empty() and not frontier_goal.empty():
-            node_start = frontier_start.get()
-            node_goal = frontier_goal.get()
-            if node_start.state == node_goal.state:
-                return node_start, node_goal
-            self.steps += 2
-            self.max_frontier_size = max(self.max_frontier_size, frontier_start.qsize() + frontier_goal.qsize())
-            for child_start in problem.expand(node_start):
-                frontier_start.put(child_start)
-            for child_goal in problem.expand(node_goal):
-                frontier_goal.put(child_goal)
+        Return the solution Node of the given problem using the bidirectional breadth-first search algorithm or None if no solution is found.
+        - the search moves backward from `goal_state` with `SearchProblem.reverse_expand`
+        - frontiers: implemented by a `deque` (FIFO), a whole level of the smaller one is expanded at each step
+        - the states reached on both sides are always recorded (whatever the search type): the frontiers meet when
+          a successor has already been reached by the other side, and the first meeting is the path with fewest actions
+        """
+        if problem.goal_state is None:
+            raise ValueError('No goal state given.')
+        state_key = problem.state_key
+        start, goal = Node(problem.initial_state), Node(problem.goal_state)
+        if problem.is_goal(start.state):
+            return start
+        reached_start, reached_goal = {state_key(start.state): start}, {state_key(goal.state): goal}
+        frontier_start, frontier_goal = deque([start]), deque([goal])
+        while frontier_start and frontier_goal:
+            self.max_frontier_size = max(self.max_frontier_size, len(frontier_start) + len(frontier_goal))
+            forward = len(frontier_start) <= len(frontier_goal)
+            if forward:
+                frontier, reached, other_reached, expand = frontier_start, reached_start, reached_goal, problem.expand
+            else:
+                frontier, reached, other_reached, expand = frontier_goal, reached_goal, reached_start, problem.reverse_expand
+            for _ in range(len(frontier)):
+                node = frontier.popleft()
+                self.steps += 1
+                for child in expand(node):
+                    key = state_key(child.state)
+                    if key in reached:
+                        self.pruned += 1
+                        continue
+                    other = other_reached.get(key)
+                    if other is not None:
+                        return self._join(child, other) if forward else self._join(other, child)
+                    reached[key] = child
+                    frontier.append(child)
         return None
 
+    def bidirectional_uniform_cost_search(self, problem):
+        """
+        Return the solution Node of the given problem using the bidirectional uniform-cost search algorithm or None if no solution is found.
+        - the search moves backward from `goal_state` with `SearchProblem.reverse_expand`
+        - frontiers: implemented by a `PriorityFrontier` with path cost as priority, the side with the cheaper Node is expanded
+        - the best meeting is updated whenever a successor has already been reached by the other side, and it's optimal
+          when the sum of the lowest path costs in the two frontiers is not lower than its cost
+        """
+        if problem.goal_state is None:
+            raise ValueError('No goal state given.')
+        state_key = problem.state_key
+        start, goal = Node(problem.initial_state), Node(problem.goal_state)
+        if problem.is_goal(start.state):
+            return start
+        reached_start, reached_goal = {}, {}
+        frontier_start, frontier_goal = PriorityFrontier(), PriorityFrontier()
+        for node, reached, frontier in ((start, reached_start, frontier_start), (goal, reached_goal, frontier_goal)):
+            key = state_key(node.state)
+            reached[key] = node
+            frontier.push(node, node.path_cost, key)
+        best_cost, meeting = float('inf'), None
+        while frontier_start and frontier_goal:
+            min_start, min_goal = frontier_start.min_priority(), frontier_goal.min_priority()
+            if min_start + min_goal >= best_cost:
+                break
+            self.max_frontier_size = max(self.max_frontier_size, len(frontier_start) + len(frontier_goal))
+            forward = min_start <= min_goal
+            if forward:
+                frontier, reached, other_reached, expand = frontier_start, reached_start, reached_goal, problem.expand
+            else:
+                frontier, reached, other_reached, expand = frontier_goal, reached_goal, reached_start, problem.reverse_expand
+            node = frontier.pop()
+            self.steps += 1
+            for child in expand(node):
+                key = state_key(child.state)
+                if not self._reach(child, key, reached):
+                    continue
+                if frontier.push(child, child.path_cost, key):
+                    self.pruned += 1
+                other = other_reached.get(key)
+                if other is not None and child.path_cost + other.path_cost < best_cost:
+                    best_cost = child.path_cost + other.path_cost
+                    meeting = (child, other) if forward else (other, child)
+        return None if meeting is None else self._join(*meeting)
+
+    def _join(self, node_start, node_goal):
+        """Return the solution Node obtained by following, from the given Node of the forward search, the path of the given Node of the backward search."""
+        node = node_start
+        while node_goal.parent is not None:
+            cost = node_goal.path_cost - node_goal.parent.path_cost
+            node = Node(node_goal.parent.state, node, node_goal.action_from_parent, node.path_cost + cost)
+            node_goal = node_goal.parent
+        return node
+
     def greedy_best_first_search(self, problem, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the greedy best-first search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `Priority queue` with heuristic as priority
+        - frontier: implemented by a `PriorityFrontier` with heuristic as priority
         """
-        frontier = PriorityQueue()
-        frontier.put((problem.h(Node(problem.initial_state)), Node(problem.initial_state)))
-        while not frontier.empty():
-            node = frontier.get()[1]
-            if problem.is_goal(node.state):
-                return node
-            self.steps += 1
-            self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
-            for child in problem.expand(node):
-                if search_type == 'tree_search' or not child.is_visited:
-                    frontier.put((problem.h(child), child))
-                    child.is_visited = True
-        return None
+        return self._best_first_search(problem, search_type, problem.h)
 
     def a_star_search(self, problem, search_type='tree_search'):
         """
         Return the solution Node of the given problem using the A* search algorithm or None if no solution is found.
         - search_type: select 'tree_search' or 'graph_search'
-        - frontier: implemented by a `Priority queue` with heuristic + path cost as priority
+        - frontier: implemented by a `PriorityFrontier` with heuristic + path cost as priority
         """
-        frontier = PriorityQueue()
-        frontier.put((problem.h(Node(problem.initial_state)) + 0, Node(problem.initial_state)))
-        while not frontier.empty():
-            node = frontier.get()[1]
+        return self._best_first_search(problem, search_type, lambda n: problem.h(n) + n.path_cost)
+
+    def ida_star_search(self, problem, search_type='tree_search'):
+        """
+        Return the solution Node of the given problem using the iterative deepening A* search algorithm or None if no solution is found.
+        - search_type: select 'tree_search' or 'graph_search'
+        - frontier: none, a depth-first search bounded by the f-cost, restarted with the smallest f-cost that exceeded the bound
+        - graph_search: only the states on the current path are checked, a table of all the reached states would defeat the purpose
+        - memory: the successors of the Nodes on the current path, the paths that would exceed `memory_limit` are given up
+        """
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        memory_limit = self.memory_limit
+        on_path = set()
+        in_memory = 1
+        self.peak_nodes = 1
+
+        def contour(node, bound):
+            """Return the solution Node within the bound, or None and the smallest f-cost that exceeded it."""
+            nonlocal in_memory
+            f = node.path_cost + problem.h(node)
+            if f > bound:
+                return None, f
             if problem.is_goal(node.state):
-                return node
+                return node, f
+            self.steps += 1
+            successors = problem.expand(node)
+            if memory_limit is not None and in_memory + len(successors) > memory_limit:
+                return None, float('inf')
+            in_memory += len(successors)
+            self.peak_nodes = max(self.peak_nodes, in_memory)
+            next_bound = float('inf')
+            for child in successors:
+                key = state_key(child.state) if graph else None
+                if key is not None:
+                    if key in on_path:
+                        self.pruned += 1
+                        continue
+                    on_path.add(key)
+                solution, f = contour(child, bound)
+                if key is not None:
+                    on_path.discard(key)
+                if solution is not None:
+                    return solution, f
+                next_bound = min(next_bound, f)
+            in_memory -= len(successors)
+            return None, next_bound
+
+        root = Node(problem.initial_state)
+        if graph:
+            on_path.add(state_key(root.state))
+        bound = problem.h(root)
+        while True:
+            solution, bound = contour(root, bound)
+            if solution is not None:
+                return solution
+            if bound == float('inf'):
+                return None
+
+    def recursive_best_first_search(self, problem, search_type='tree_search'):
+        """
+        Return the solution Node of the given problem using the recursive best-first search algorithm or None if no solution is found.
+        - search_type: select 'tree_search' or 'graph_search'
+        - frontier: none, the f-cost of the best alternative path is used as limit, and backed up when the recursion unwinds
+        - graph_search: only the states on the current path are checked
+        - memory: the successors of the Nodes on the current path, the paths that would exceed `memory_limit` are given up
+        """
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        memory_limit = self.memory_limit
+        on_path = set()
+        in_memory = 1
+        self.peak_nodes = 1
+
+        def rbfs(node, f_node, f_limit):
+            """Return the solution Node within the limit, or None and the backed-up f-cost of the Node."""
+            nonlocal in_memory
+            if problem.is_goal(node.state):
+                return node, f_node
             self.steps += 1
-            self.max_frontier_size = max(self.max_frontier_size, frontier.qsize())
+            successors = []
             for child in problem.expand(node):
-                if search_type == 'tree_search' or not child.is_visited:
-                    frontier.put((problem.h(child) + child.path_cost, child))
-                    child.is_visited = True
+                key = state_key(child.state) if graph else None
+                if key in on_path:
+                    self.pruned += 1
+                    continue
+                # the f-cost of the successors is never lower than the (backed-up) one of their parent
+                successors.append([max(child.path_cost + problem.h(child), f_node), len(successors), child, key])
+            if not successors:
+                return None, float('inf')
+            if memory_limit is not None and in_memory + len(successors) > memory_limit:
+                return None, float('inf')
+            in_memory += len(successors)
+            self.peak_nodes = max(self.peak_nodes, in_memory)
+            while True:
+                successors.sort()
+                best = successors[0]
+                if best[0] > f_limit or best[0] == float('inf'):
+                    # every path fails (with an infinite limit, the first condition never holds)
+                    in_memory -= len(successors)
+                    return None, best[0]
+                alternative = successors[1][0] if len(successors) > 1 else float('inf')
+                if best[3] is not None:
+                    on_path.add(best[3])
+                solution, best[0] = rbfs(best[2], best[0], min(f_limit, alternative))
+                if best[3] is not None:
+                    on_path.discard(best[3])
+                if solution is not None:
+                    return solution, best[0]
+
+        root = Node(problem.initial_state)
+        if graph:
+            on_path.add(state_key(root.state))
+        solution, _ = rbfs(root, problem.h(root), float('inf'))
+        return solution
+
+    def sma_star_search(self, problem, memory_limit, search_type='tree_search'):
+        """
+        Return the solution Node of the given problem using the simplified memory-bounded A* search algorithm or None if no solution is found.
+        - memory_limit: the maximum number of Nodes in memory, solutions deeper than `memory_limit - 1` can't be found
+        - search_type: select 'tree_search' or 'graph_search'
+        - frontier: the `BoundedNode`s in memory, in two `heapq`s (lowest f-cost and deepest first to select,
+          highest f-cost and shallowest first to forget)
+        - graph_search: only the states on the current path are checked
+        """
+        assert memory_limit >= 2, 'Panic: SMA* needs room for at least two Nodes'
+        graph, state_key = search_type == 'graph_search', problem.state_key
+        counter = count()
+        in_memory = set()
+        open_heap = []
+        leaf_heap = []
+
+        def update(b):
+            """(Re)insert the given BoundedNode in the heaps, the old entries become stale."""
+            b.version += 1
+            if b.is_open():
+                heapq.heappush(open_heap, (b.f, -b.node.depth, next(counter), b.version, b))
+            if not b.children:
+                heapq.heappush(leaf_heap, (-b.f, b.node.depth, next(counter), b.version, b))
+
+        def new_node(node, key, f, parent, index, actions, is_goal):
+            b = BoundedNode(node, key, f, parent, index, actions, is_goal)
+            in_memory.add(b)
+            self.peak_nodes = max(self.peak_nodes, len(in_memory))
+            update(b)
+            return b
+
+        def back_up(b):
+            """Once all its successors have been generated, the f-cost of a Node is the lowest one of its successors."""
+            while b is not None and not b.is_goal and b.next_action == len(b.actions):
+                f = min(min((c.f for c in b.children.values()), default=float('inf')), min(b.forgotten.values(), default=float('inf')))
+                if f == b.f:
+                    break
+                b.f = f
+                update(b)
+                b = b.parent
+
+        def forget(selected):
+            """Forget the worst leaf (highest f-cost, shallowest), except the selected Node."""
+            skipped = []
+            while True:
+                entry = heapq.heappop(leaf_heap)
+                b = entry[-1]
+                if entry[3] != b.version:
+                    continue
+                if b is selected or b.parent is None:
+                    skipped.append(entry)
+                    continue
+                break
+            for entry in skipped:
+                heapq.heappush(leaf_heap, entry)
+            parent = b.parent
+            del parent.children[b.index]
+            parent.forgotten[b.index] = b.f
+            b.version = -1
+            in_memory.discard(b)
+            update(parent)
+
+        root = Node(problem.initial_state)
+        new_node(root, state_key(root.state) if graph else None, problem.h(root), None, None,
+                 problem.actions(root.state), problem.is_goal(root.state))
+        while open_heap:
+            f, _, _, version, b = heapq.heappop(open_heap)
+            if version != b.version:
+                continue
+            if f == float('inf'):
+                # no solution within the memory limit
+                return None
+            if b.is_goal:
+                return b.node
+            self.steps += 1
+            self.max_frontier_size = max(self.max_frontier_size, len(open_heap))
+            # next successor: a new one, or the most promising forgotten one
+            if b.next_action < len(b.actions):
+                index = b.next_action
+                b.next_action += 1
+                child = problem.child_node(b.node, b.actions[index])
+                f = max(b.f, child.path_cost + problem.h(child))
+            else:
+                index = min(b.forgotten, key=b.forgotten.get)
+                child = problem.child_node(b.node, b.actions[index])
+                f = b.forgotten.pop(index)
+            key = state_key(child.state) if graph else None
+            ancestor = b
+            while key is not None and ancestor is not None and ancestor.key != key:
+                ancestor = ancestor.parent
+            actions, is_goal = problem.actions(child.state), problem.is_goal(child.state)
+            if key is not None and ancestor is not None:
+                # loop on the current path
+                self.pruned += 1
+            elif not is_goal and (not actions or child.depth >= memory_limit - 1):
+                # dead end, or there is no memory to go deeper
+                pass
+            else:
+                if len(in_memory) == memory_limit:
+                    forget(b)
+                b.children[index] = new_node(child, key, f, b, index, actions, is_goal)
+            # the successors with an infinite f-cost are simply dropped
+            update(b)
+            back_up(b)
+            if len(open_heap) + len(leaf_heap) > 4 * len(in_memory) + 64:
+                # drop the stale entries
+                open_heap[:] = [e for e in open_heap if e[3] == e[-1].version]
+                leaf_heap[:] = [e for e in leaf_heap if e[3] == e[-1].version]
+                heapq.heapify(open_heap)
+                heapq.heapify(leaf_heap)
         return None
@@ -0,0 +1,103 @@
+"""
+Expansions per second of the `SearchStrategy` strategies on random 8-puzzle instances.
+
+Optionally, compare with another version of `Search_Problems_Classes.py`, e.g.:
+    git show <commit>:2023-24/contrib/Search_Problems_Classes.py > /tmp/baseline.py
+    python search_benchmark.py --baseline /tmp/baseline.py
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+MOVES = {'U': -3, 'D': 3, 'L': -1, 'R': 1}
+
+
+def load_module(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def puzzle_class(module):
+    class EightPuzzle(module.SearchProblem):
+        def actions(self, state):
+            row, col = divmod(state.index(0), 3)
+            return [a for a, ok in (('U', row > 0), ('D', row < 2), ('L', col > 0), ('R', col < 2)) if ok]
+
+        def apply_action(self, state, action):
+            blank = state.index(0)
+            tile = blank + MOVES[action]
+            new_state = list(state)
+            new_state[blank], new_state[tile] = new_state[tile], new_state[blank]
+            return tuple(new_state)
+
+        def h(self, node):
+            """Manhattan distance"""
+            return sum(abs(i // 3 - (v - 1) // 3) + abs(i % 3 - (v - 1) % 3) for i, v in enumerate(node.state) if v)
+
+    return EightPuzzle
+
+
+def scramble(problem_class, moves, rng):
+    problem = problem_class(GOAL, GOAL)
+    state = GOAL
+    for _ in range(moves):
+        state = problem.apply_action(state, rng.choice(problem.actions(state)))
+    return problem_class(state, GOAL)
+
+
+def benchmark(module, strategies, args):
+    problem_class = puzzle_class(module)
+    rng = random.Random(args.seed)
+    problems = [scramble(problem_class, args.moves, rng) for _ in range(args.instances)]
+    results = {}
+    for search_type, strategy_name, limit in strategies:
+        strategy = module.SearchStrategy(search_type, strategy_name, limit)
+        steps, cost = 0, 0
+        start = time.perf_counter()
+        for problem in problems:
+            solution = strategy.search(problem)
+            steps += strategy.steps
+            cost += solution.path_cost if solution is not None else 0
+        elapsed = time.perf_counter() - start
+        results[(search_type, strategy_name)] = (steps, steps / elapsed, cost)
+    return results
+
+
+def main(args):
+    strategies = [
+        ('graph_search', 'breadth_first', None),
+        ('graph_search', 'depth_limited', args.moves),
+        ('graph_search', 'uniform_cost', None),
+        ('graph_search', 'greedy_best_first', None),
+        ('graph_search', 'a_star', None),
+        ('tree_search', 'a_star', None),
+        ('tree_search', 'iterative_deepening', None),
+    ]
+    modules = {'current': load_module(args.module, 'current')}
+    if args.baseline:
+        modules['baseline'] = load_module(args.baseline, 'baseline')
+    results = {n: benchmark(m, strategies, args) for n, m in modules.items()}
+
+    print(f"{'search':<14}{'strategy':<22}" + ''.join(f'{n + " exp/s":>18}{"steps":>10}' for n in results), end='')
+    print(f"{'speedup':>10}" if args.baseline else '')
+    for search_type, strategy_name, _ in strategies:
+        row = [results[n][(search_type, strategy_name)] for n in results]
+        print(f'{search_type:<14}{strategy_name:<22}' + ''.join(f'{r[1]:>18,.0f}{r[0]:>10}' for r in row), end='')
+        print(f'{row[0][1] / row[1][1]:>9.2f}x' if args.baseline else '')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the SearchStrategy strategies on the 8-puzzle')
+    parser.add_argument('--module', default=os.path.join(HERE, 'Search_Problems_Classes.py'))
+    parser.add_argument('--baseline', help='another version of Search_Problems_Classes.py to compare with')
+    parser.add_argument('--instances', type=int, default=20)
+    parser.add_argument('--moves', type=int, default=12, help='random moves used to scramble each instance')
+    parser.add_argument('--seed', type=int, default=42)
+    main(parser.parse_args())
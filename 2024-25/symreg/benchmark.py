@@ -0,0 +1,183 @@
+# Copyright © 2024 Giovanni Squillero <giovanni.squillero@polito.it>
+# https://github.com/squillero/computational-intelligence
+# Free under certain conditions — see the license for details.
+
+import argparse
+import glob
+import importlib.util
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from gxgp import DagGP, RandomStreams, xover_swap_subtree
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OPERATORS = [np.add, np.subtract, np.multiply, np.divide, np.sin, np.cos]
+
+
+def load_module(path: str):
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func, *, min_time: float = 0.2):
+    """Return the average time of `func()` over enough repetitions to last at least `min_time` seconds"""
+    repetitions, elapsed = 0, 0.0
+    start = time.perf_counter()
+    while elapsed < min_time:
+        func()
+        repetitions += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / repetitions
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_reference(func, x, y, *, min_time: float = 0.2):
+    if func(x) is None:
+        # formula not (yet) implemented
+        return None
+    return {
+        'eval_time': timed(lambda: func(x), min_time=min_time),
+        'mse': float(np.mean(np.square(y - func(x)))),
+    }
+
+
+def benchmark_problem(path: str, args, references: dict) -> dict:
+    with np.load(path) as problem:
+        x, y = problem['x'], problem['y']
+    X = x.T
+    n = int(re.search(r'problem_(\d+)', path).group(1))
+    result = {'problem': os.path.basename(path), 'n_samples': len(y), 'n_variables': len(x)}
+
+    # separate streams, so that timings (with a variable number of repetitions) don't affect the evolution
+    streams = RandomStreams(args.seed)
+    dag = DagGP(OPERATORS, len(x), args.constants, rng=streams.random(n, 0))
+    population = [dag.create_individual(args.individual_size) for _ in range(args.population_size)]
+
+    # expression evaluation
+    sample = population[: args.eval_individuals]
+    rows = X[: args.scalar_rows]
+    result['eval_scalar_time_per_row'] = timed(
+        lambda: [DagGP.evaluate(i, rows) for i in sample], min_time=args.min_time
+    ) / (len(sample) * len(rows))
+    result['eval_vectorized_time'] = timed(
+        lambda: [DagGP.evaluate(i, X, vectorized=True) for i in sample], min_time=args.min_time
+    ) / len(sample)
+
+    # crossover
+    xover_rng = streams.random(n, 1)
+    result['xover_time'] = timed(
+        lambda: xover_swap_subtree(xover_rng.choice(population), xover_rng.choice(population), rng=xover_rng),
+        min_time=args.min_time,
+    )
+
+    # whole generations: tournament selection, crossover, vectorized MSE, (mu + lambda) replacement
+    def mse(individual):
+        value = DagGP.mse(individual, X, y, vectorized=True)
+        return value if np.isfinite(value) else np.inf
+
+    rng = streams.random(n, 2)
+
+    def generation(population, fitness):
+        def tournament():
+            return min(rng.sample(range(len(population)), k=3), key=lambda i: fitness[i])
+
+        offspring = [
+            xover_swap_subtree(population[tournament()], population[tournament()], rng=rng)
+            for _ in range(args.population_size)
+        ]
+        everybody = population + offspring
+        everybody_fitness = fitness + [mse(i) for i in offspring]
+        ranking = sorted(range(len(everybody)), key=lambda i: everybody_fitness[i])[: args.population_size]
+        return [everybody[i] for i in ranking], [everybody_fitness[i] for i in ranking]
+
+    fitness = [mse(i) for i in population]
+    start = time.perf_counter()
+    for _ in range(args.generations):
+        population, fitness = generation(population, fitness)
+    elapsed = time.perf_counter() - start
+    result['generation_time'] = elapsed / args.generations if args.generations else None
+    result['evaluations_per_second'] = args.population_size * args.generations / elapsed if elapsed else None
+    result['final_mse'] = float(min(fitness))
+
+    # memory is traced on one extra generation, not to slow down the timed ones
+    tracemalloc.start()
+    generation(population, fitness)
+    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if f'f{n}' in references:
+        result['reference'] = benchmark_reference(references[f'f{n}'], x, y, min_time=args.min_time)
+    return result
+
+
+def main(args):
+    references = dict()
+    for path in args.reference:
+        module = load_module(path)
+        references.update({k: v for k, v in vars(module).items() if re.fullmatch(r'f\d+', k) and callable(v)})
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'verbose')},
+        'problems': list(),
+    }
+    for path in sorted(glob.glob(os.path.join(args.data, 'problem_*.npz'))):
+        logging.info(f'Benchmarking {path}')
+        results['problems'].append(benchmark_problem(path, args, references))
+        logging.debug(results['problems'][-1])
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    logging.info(f'Results saved to {args.output}')
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S")
+    logging.getLogger().setLevel(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Benchmark gxgp on the project-work problems")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="increase log verbosity")
+    parser.add_argument(
+        "-d", "--debug", action="store_const", dest="verbose", const=2, help="log debug messages (same as -vv)"
+    )
+    parser.add_argument("--data", default=os.path.join(HERE, '..', 'project-work', 'data'), help="problems directory")
+    parser.add_argument(
+        "--reference",
+        nargs='*',
+        default=[os.path.join(HERE, '..', 'project-work', 'd3584.py')],
+        help="modules defining reference formulas f0, f1, ...",
+    )
+    parser.add_argument("-o", "--output", default='benchmark.json', help="output file (JSON)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--constants", type=int, default=5)
+    parser.add_argument("--individual-size", type=int, default=20)
+    parser.add_argument("--population-size", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--eval-individuals", type=int, default=10)
+    parser.add_argument("--scalar-rows", type=int, default=100)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum duration of each timing (seconds)")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(level=logging.DEBUG)
+
+    main(args)
@@ -11,10 +11,22 @@ try:
 except ImportError:
     pass
 
+from .cache import *
+from .compiler import *
+from .context import *
 from .draw import *
 from .gp_common import *
 from .gp_dag import *
 from .gp_tree import *
+from .intervals import *
+from .islands import *
 from .node import *
-from .random import gxgp_random
+from .optimize import *
+from .parallel import *
+from .postfix import *
+from .random import RandomStreams, gxgp_random
+from .registry import *
+from .sampling import *
+from .semantics import *
+from .simplify import *
 from .utils import *
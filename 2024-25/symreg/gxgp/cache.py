@@ -0,0 +1,99 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from .node import Node
+
+__all__ = ['FitnessCache']
+
+
+class FitnessCache:
+    """Bounded LRU cache of fitness values keyed by the structural key of the individuals
+
+    Identical and trivially equivalent (commuted) individuals share the same entry."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._generation_hits = 0
+        self._generation_misses = 0
+        self.history = list()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, individual: Node):
+        return individual.structural_key in self._data
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Drop all cached values (e.g., when the data set changes), keeping the statistics"""
+        self._data.clear()
+
+    def get(self, individual: Node, default=None):
+        key = individual.structural_key
+        if key not in self._data:
+            self.misses += 1
+            self._generation_misses += 1
+            return default
+        self.hits += 1
+        self._generation_hits += 1
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, individual: Node, fitness):
+        key = individual.structural_key
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def fitness(self, individuals: list[Node], evaluate: Callable[[list[Node]], np.ndarray]) -> np.ndarray:
+        """Return the fitness of a batch, calling `evaluate` only on the individuals not in cache (once each)"""
+        result = np.empty(len(individuals))
+        missing = dict()
+        for i, individual in enumerate(individuals):
+            key = individual.structural_key
+            if key in missing:
+                # duplicate inside the batch, will be evaluated once
+                self.hits += 1
+                self._generation_hits += 1
+                missing[key].append(i)
+                continue
+            value = self.get(individual)
+            if value is not None:
+                result[i] = value
+            else:
+                missing[key] = [i]
+        if missing:
+            unknown = [individuals[indexes[0]] for indexes in missing.values()]
+            for indexes, individual, value in zip(missing.values(), unknown, evaluate(unknown)):
+                result[indexes] = value
+                self.put(individual, value)
+        return result
+
+    def end_generation(self) -> dict:
+        """Record and return the statistics of the current generation, then reset them"""
+        total = self._generation_hits + self._generation_misses
+        stats = {
+            'hits': self._generation_hits,
+            'misses': self._generation_misses,
+            'hit_rate': self._generation_hits / total if total else 0.0,
+        }
+        self.history.append(stats)
+        self._generation_hits = 0
+        self._generation_misses = 0
+        return stats
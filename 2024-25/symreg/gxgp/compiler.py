@@ -0,0 +1,183 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import inspect
+import math
+from collections import OrderedDict
+from typing import Callable, Collection
+
+import numpy as np
+
+from .node import Node
+from .registry import operator_registry
+
+__all__ = ['Compiler', 'to_source', 'compile_individual']
+
+_INFIX = {
+    np.add: '+',
+    np.subtract: '-',
+    np.multiply: '*',
+    np.divide: '/',
+    np.power: '**',
+}
+
+
+def _variable_names(variables: int | Collection) -> list[str]:
+    if isinstance(variables, int):
+        return [f'x{i}' for i in range(variables)]
+    return list(variables)
+
+
+def _constant(value) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'np.nan'
+    if math.isinf(value):
+        return 'np.inf' if value > 0 else '(-np.inf)'
+    return repr(value) if value >= 0 else f'({value!r})'
+
+
+def _intern(node: Node, memo: dict, table: dict) -> int:
+    """Return an integer key, equal for identical subexpressions (even if they are different objects)"""
+    if id(node) in memo:
+        return memo[id(node)][1]
+    if node._op is None:
+        signature = (isinstance(node._value, str), node._value)
+    else:
+        signature = (node._op_id, tuple(_intern(c, memo, table) for c in node._successors))
+    key = table.setdefault(signature, len(table))
+    memo[id(node)] = (node, key)
+    return key
+
+
+def _source(node: Node, variables: int | Collection, name: str, protected: bool = False) -> tuple[str, dict]:
+    """Return the source of the function and the non-NumPy callables it references"""
+    indexes = {n: i for i, n in enumerate(_variable_names(variables))}
+    table = dict()
+    _intern(node, dict(), table)
+
+    # table is in post-order: successors always come before their parents
+    references = [0] * len(table)
+    for _, successors in table:
+        if isinstance(successors, tuple):
+            for c in successors:
+                references[c] += 1
+
+    helpers = dict()
+    expressions = [None] * len(table)
+    lines = list()
+    has_variables = False
+    for (first, second), key in table.items():
+        if not isinstance(second, tuple):
+            if first:
+                assert second in indexes, f"Panic: Unknown variable '{second}'"
+                expressions[key] = f'x[{indexes[second]}]'
+                has_variables = True
+            else:
+                expressions[key] = _constant(second)
+            continue
+        operator = operator_registry[first]
+        implementation = operator.protected if protected else operator.vectorized
+        args = [expressions[c] for c in second]
+        if implementation in _INFIX and len(args) == 2:
+            expression = f'({args[0]} {_INFIX[implementation]} {args[1]})'
+        elif implementation is np.negative:
+            expression = f'(-{args[0]})'
+        else:
+            if isinstance(implementation, np.ufunc) and getattr(np, implementation.__name__, None) is implementation:
+                function = f'np.{implementation.__name__}'
+            else:
+                if implementation is operator.vectorized:
+                    function = operator.name
+                else:
+                    function = getattr(implementation, '__name__', '')
+                if not function.isidentifier() or function == 'λ':
+                    function = ''
+                if helpers.get(function, implementation) is not implementation:
+                    # anonymous, or two different operators with the same name
+                    function = ''
+                function = function or f'op{operator.id}'
+                helpers[function] = implementation
+            expression = f"{function}({', '.join(args)})"
+        if references[key] > 1:
+            # shared subexpression: computed once
+            lines.append(f'    t{key} = {expression}')
+            expression = f't{key}'
+        expressions[key] = expression
+
+    if has_variables:
+        lines.append(f'    return {expressions[-1]}')
+    else:
+        lines.append(f'    return np.full(x.shape[1:], {expressions[-1]})')
+    return f'def {name}(x: np.ndarray) -> np.ndarray:\n' + '\n'.join(lines) + '\n', helpers
+
+
+def to_source(node: Node, variables: int | Collection, *, name: str = 'f', protected: bool = False) -> str:
+    """Return the source of a standalone NumPy function `name(x)` computing `node`
+
+    As in the project work, `x` has one row per variable (i.e., `x[i]` is the i-th variable). Shared
+    subexpressions are hoisted into temporaries. If `protected`, operators are replaced by their protected
+    version (e.g., `np.divide` by `protected_divide`, see `Operator.protected`). Operators not available in
+    NumPy are defined before the function, thus they must be plain functions (e.g., the protected ones,
+    not lambdas)."""
+    source, helpers = _source(node, variables, name, protected)
+    assert all(n == h.__name__ for n, h in helpers.items()), "Panic: Can't export anonymous operators"
+    definitions = [inspect.getsource(h) for h in helpers.values()]
+    return '\n\n'.join(definitions + [source])
+
+
+def compile_individual(
+    node: Node, variables: int | Collection, *, name: str = 'f', protected: bool = False
+) -> Callable:
+    """Return `node` compiled into a NumPy function `f(x)` (see `to_source`)"""
+    source, helpers = _source(node, variables, name, protected)
+    namespace = {'np': np, **helpers}
+    exec(compile(source, f'<gxgp:{name}>', 'exec'), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+class Compiler:
+    """Compile individuals on demand, caching the result by structural key
+
+    Useful for individuals evaluated over and over on the full data set (e.g., the elites). If `protected`,
+    operators are compiled into their protected version (see `to_source`)."""
+
+    def __init__(self, variables: int | Collection, *, cache_size: int = 1_000, protected: bool = False):
+        self._variables = _variable_names(variables)
+        self._protected = protected
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self.compilations = 0
+        self.cache_hits = 0
+
+    def __str__(self):
+        return f'Compiler(compilations={self.compilations}, cache_hits={self.cache_hits})'
+
+    def __call__(self, individual: Node) -> Callable:
+        key = individual.structural_key
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        function = compile_individual(individual, self._variables, protected=self._protected)
+        self.compilations += 1
+        self._cache[key] = function
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return function
+
+    def fitness(self, individuals: list[Node], X, y) -> np.ndarray:
+        """Return the MSE of the individuals on X (one row per sample), invalid results are mapped to +inf"""
+        x = np.ascontiguousarray(np.asarray(X).T)
+        y = np.asarray(y)
+        result = np.empty(len(individuals))
+        with np.errstate(all='ignore'):
+            for i, individual in enumerate(individuals):
+                result[i] = np.mean(np.square(y - self(individual)(x)))
+        result[~np.isfinite(result)] = np.inf
+        return result
@@ -0,0 +1,57 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+__all__ = ['EvalContext']
+
+
+class EvalContext:
+    """Evaluate expressions computing each distinct node only once
+
+    Results are keyed by node identity, thus a successor shared by many parents in a DAG is
+    evaluated once per call to `evaluate`. Counters accumulate across calls."""
+
+    def __init__(self):
+        self._cache = dict()
+        self._variables = dict()
+        self._vectorized = False
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f'EvalContext(hits={self.hits}, misses={self.misses}, hit_rate={self.hit_rate:.2%})'
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, node: "Node", variables: dict, *, vectorized=False, values: dict = None):
+        """Evaluate `node`; `values` may force the result of some nodes (e.g., to try different constants)"""
+        self._cache.clear()
+        if values:
+            self._cache.update((id(n), (n, v)) for n, v in values.items())
+        self._variables = variables
+        self._vectorized = vectorized
+        try:
+            return self._evaluate(node)
+        finally:
+            self._cache.clear()
+
+    def _evaluate(self, node: "Node"):
+        cached = self._cache.get(id(node))
+        if cached is not None:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        func = node._vfunc if self._vectorized else node._func
+        value = func(*[self._evaluate(c) for c in node._successors], **self._variables)
+        # keep a reference to the node, so that its id can't be recycled while cached
+        self._cache[id(node)] = (node, value)
+        return value
@@ -4,8 +4,6 @@
 #    / \
 #  10   11   Distributed under MIT License
 
-import inspect
-
 
 def draw(node: "Node"):
     import networkx as nx
@@ -32,7 +30,7 @@ def draw(node: "Node"):
     nx.draw_networkx_nodes(
         G,
         nodelist=[id(n) for n in node.subtree if
-                  n.is_leaf and len(inspect.getfullargspec(n._func).kwonlyargs) == 1],
+                  n.is_leaf and isinstance(n._value, str)],
         pos=pos,
         node_size=500,
         node_color='lightgreen',
@@ -41,7 +39,7 @@ def draw(node: "Node"):
     nx.draw_networkx_nodes(
         G,
         nodelist=[id(n) for n in node.subtree if
-                  n.is_leaf and len(inspect.getfullargspec(n._func).kwonlyargs) == 0],
+                  n.is_leaf and not isinstance(n._value, str)],
         pos=pos,
         node_size=500,
         node_color='lightblue',
@@ -4,22 +4,28 @@
 #    / \
 #  10   11   Distributed under MIT License
 
-from copy import deepcopy
-
 from .node import Node
 from .random import gxgp_random
 
+__all__ = ['random_path', 'xover_swap_subtree', 'mutation_replace_subtree']
+
+
+def random_path(tree: Node, *, rng=gxgp_random, include_root=True) -> list[int]:
+    """Return the path to a node drawn uniformly from the tree, in O(depth)"""
+    if include_root or tree.is_leaf:
+        return tree.path_to(rng.randrange(len(tree)))
+    return tree.path_to(rng.randrange(1, len(tree)))
+
+
+def xover_swap_subtree(tree1: Node, tree2: Node, *, rng=gxgp_random) -> Node:
+    """Replace a random subtree of `tree1` with a random subtree of `tree2`
+
+    Nodes are never copied: the offspring shares all untouched subtrees with its parents."""
+    path = random_path(tree1, rng=rng, include_root=False)
+    donor = tree2.get(random_path(tree2, rng=rng))
+    return tree1.replace(path, donor)
+
 
-def xover_swap_subtree(tree1: Node, tree2: Node) -> Node:
-    offspring = deepcopy(tree1)
-    ic(offspring)
-    successors = None
-    while not successors:
-        node = gxgp_random.choice(list(offspring.subtree))
-        successors = node.successors
-    i = gxgp_random.randrange(len(successors))
-    ic(successors, i)
-    successors[i] = deepcopy(gxgp_random.choice(list(tree2.subtree)))
-    ic(successors, i)
-    node.successors = successors
-    return offspring
+def mutation_replace_subtree(tree: Node, new_subtree: Node, *, rng=gxgp_random) -> Node:
+    """Replace a random subtree of `tree` with `new_subtree` (path copying, no deep copy)"""
+    return tree.replace(random_path(tree, rng=rng, include_root=False), new_subtree)
@@ -6,22 +6,28 @@
 
 from typing import Collection
 
+import numpy as np
+
+from .context import EvalContext
 from .node import Node
 from .random import gxgp_random
-from .utils import arity
+from .registry import operator_registry
 
 __all__ = ['DagGP']
 
 
 class DagGP:
-    def __init__(self, operators: Collection, variables: int | Collection, constants: int | Collection):
+    def __init__(
+        self, operators: Collection, variables: int | Collection, constants: int | Collection, *, rng=gxgp_random
+    ):
+        self._rng = rng
         self._operators = list(operators)
         if isinstance(variables, int):
             self._variables = [Node(DagGP.default_variable(i)) for i in range(variables)]
         else:
             self._variables = [Node(t) for t in variables]
         if isinstance(constants, int):
-            self._constants = [Node(gxgp_random.random()) for i in range(constants)]
+            self._constants = [Node(rng.random()) for i in range(constants)]
         else:
             self._constants = [Node(t) for t in constants]
 
@@ -29,8 +35,8 @@ class DagGP:
         pool = self._variables * (1 + len(self._constants) // len(self._variables)) + self._constants
         individual = None
         while individual is None or len(individual) < n_nodes:
-            op = gxgp_random.choice(self._operators)
-            params = gxgp_random.choices(pool, k=arity(op))
+            op = self._rng.choice(self._operators)
+            params = self._rng.choices(pool, k=operator_registry.get(op).arity)
             individual = Node(op, params)
             pool.append(individual)
         return individual
@@ -40,15 +46,24 @@ class DagGP:
         return f'x{i}'
 
     @staticmethod
-    def evaluate(individual: Node, X, variable_names=None):
+    def evaluate(individual: Node, X, variable_names=None, *, vectorized=False, context: EvalContext = None):
+        if context is None:
+            context = EvalContext()
         if variable_names:
             names = variable_names
         else:
             names = [DagGP.default_variable(i) for i in range(len(X[0]))]
 
+        if vectorized:
+            # one pass over the tree, each node working on whole columns
+            columns = np.ascontiguousarray(np.asarray(X).T)
+            with np.errstate(all='ignore'):
+                y_pred = context.evaluate(individual, dict(zip(names, columns)), vectorized=True)
+            return np.broadcast_to(y_pred, (len(X),))
+
         y_pred = list()
         for row in X:
-            y_pred.append(individual(**{n: v for n, v in zip(names, row)}))
+            y_pred.append(context.evaluate(individual, {n: v for n, v in zip(names, row)}))
         return y_pred
 
     @staticmethod
@@ -63,6 +78,8 @@ class DagGP:
         return y_pred
 
     @staticmethod
-    def mse(individual: Node, X, y, variable_names=None):
-        y_pred = DagGP.evaluate(individual, X, variable_names)
+    def mse(individual: Node, X, y, variable_names=None, *, vectorized=False, context: EvalContext = None):
+        y_pred = DagGP.evaluate(individual, X, variable_names, vectorized=vectorized, context=context)
+        if vectorized:
+            return float(np.mean(np.square(np.asarray(y) - y_pred)))
         return sum((a - b) ** 2 for a, b in zip(y, y_pred)) / len(y)
@@ -5,14 +5,247 @@
 #  10   11   Distributed under MIT License
 
 import random
-from typing import Collection
+import time
+from typing import Callable, Collection
 
+import numpy as np
+
+from .cache import FitnessCache
+from .compiler import Compiler
+from .context import EvalContext
+from .gp_common import mutation_replace_subtree, xover_swap_subtree
+from .intervals import IntervalScreen
 from .node import Node
-from .utils import arity
+from .registry import operator_registry
+from .sampling import MiniBatchSampler
+from .simplify import Simplifier
 
 __all__ = ['TreeGP']
 
 
 class TreeGP:
-    def __init__(self, operators: Collection, variables: int | Collection, constants: int | Collection, *, seed=42):
-        raise NotImplementedError
+    def __init__(
+        self, operators: Collection, variables: int | Collection, constants: int | Collection, *, seed=42, rng=None
+    ):
+        """`rng`, if given, is used instead of a new generator seeded with `seed` (see `RandomStreams`)"""
+        self._random = rng if rng is not None else random.Random(seed)
+        self._operators = list(operators)
+        self._arities = [operator_registry.get(op).arity for op in self._operators]
+        assert all(a is not None for a in self._arities), "Panic: TreeGP operators must have a fixed arity"
+        if isinstance(variables, int):
+            self._variable_names = [TreeGP.default_variable(i) for i in range(variables)]
+        else:
+            self._variable_names = list(variables)
+        self._variables = [Node(n) for n in self._variable_names]
+        if isinstance(constants, int):
+            self._constants = [Node(self._random.random()) for i in range(constants)]
+        else:
+            self._constants = [Node(t) for t in constants]
+        self._terminals = self._variables + self._constants
+        self.fitness_evaluations = 0
+        self.history = list()
+
+    @staticmethod
+    def default_variable(i: int) -> str:
+        return f'x{i}'
+
+    def create_individual(self, max_depth: int, *, method: str = 'grow') -> Node:
+        """Create a random tree with the 'grow' or 'full' method"""
+        assert method in ('grow', 'full'), f"Panic: Unknown initialization method '{method}'"
+        if max_depth == 0 or (
+            method == 'grow'
+            and self._random.random() < len(self._terminals) / (len(self._terminals) + len(self._operators))
+        ):
+            return self._random.choice(self._terminals)
+        i = self._random.randrange(len(self._operators))
+        successors = [self.create_individual(max_depth - 1, method=method) for _ in range(self._arities[i])]
+        return Node(self._operators[i], successors)
+
+    def ramped_half_and_half(self, population_size: int, min_depth: int = 2, max_depth: int = 6) -> list[Node]:
+        depths = range(min_depth, max_depth + 1)
+        return [
+            self.create_individual(depths[i % len(depths)], method='full' if i % 2 else 'grow')
+            for i in range(population_size)
+        ]
+
+    def tournament(self, fitness: np.ndarray, tournament_size: int) -> int:
+        """Return the index of the best of `tournament_size` random individuals (lower fitness is better)"""
+        candidates = [self._random.randrange(len(fitness)) for _ in range(tournament_size)]
+        return min(candidates, key=lambda i: fitness[i])
+
+    def xover(self, tree1: Node, tree2: Node) -> Node:
+        return xover_swap_subtree(tree1, tree2, rng=self._random)
+
+    def mutate(self, tree: Node, max_depth: int = 2) -> Node:
+        """Replace a random subtree with a new random one"""
+        return mutation_replace_subtree(tree, self.create_individual(max_depth), rng=self._random)
+
+    def evaluate(self, individual: Node, X) -> np.ndarray:
+        columns = np.ascontiguousarray(np.asarray(X).T)
+        with np.errstate(all='ignore'):
+            y_pred = EvalContext().evaluate(individual, dict(zip(self._variable_names, columns)), vectorized=True)
+        return np.broadcast_to(y_pred, (len(X),))
+
+    def fitness(self, individuals: list[Node], X, y) -> np.ndarray:
+        """Return the MSE of a batch of individuals (invalid results are mapped to +inf)"""
+        columns = np.ascontiguousarray(np.asarray(X).T)
+        variables = dict(zip(self._variable_names, columns))
+        y = np.asarray(y)
+        context = EvalContext()
+        result = np.empty(len(individuals))
+        with np.errstate(all='ignore'):
+            for i, individual in enumerate(individuals):
+                result[i] = np.mean(np.square(y - context.evaluate(individual, variables, vectorized=True)))
+        result[~np.isfinite(result)] = np.inf
+        self.fitness_evaluations += len(individuals)
+        return result
+
+    def evolve(
+        self,
+        X,
+        y,
+        *,
+        population_size: int = 500,
+        generations: int = 50,
+        max_depth: int = 6,
+        max_depth_limit: int = 17,
+        tournament_size: int = 3,
+        p_xover: float = 0.9,
+        p_mutation: float = 0.1,
+        elitism: int = 1,
+        evaluator: Callable[[list[Node]], np.ndarray] = None,
+        cache: FitnessCache = None,
+        sampler: MiniBatchSampler = None,
+        simplifier: Simplifier = None,
+        compiler: Compiler = None,
+        screen: IntervalScreen = None,
+        parsimony: float = 0.0,
+        verbose: bool = False,
+    ) -> Node:
+        """Generational GP with elitism; only new individuals are evaluated, once, in a single batch
+
+        `evaluator`, if given, replaces `self.fitness` for computing the fitness of a batch (e.g., the
+        method `fitness` of a `ParallelEvaluator` built on the same X and y). With a `cache`, structurally
+        equivalent individuals are evaluated only once and the hit rate is reported for each generation.
+        With a `sampler`, each generation is evaluated on a mini-batch of rows (survivors are re-scored along
+        with the new offspring when the batch changes, thus everybody is evaluated once per generation), and
+        elites are periodically re-scored on the full data set; the best individual on the full data set is
+        returned (if none has a finite fitness, the best of the last mini-batch). With a `simplifier`, new
+        offspring are simplified before being evaluated, and the evaluation time saved on a sample of them is
+        reported; with a `compiler` (mini-batches only), elites are re-scored through compiled NumPy functions
+        (cached, thus compiled once for as long as they survive). With a `screen`, individuals rejected by
+        interval analysis get an infinite fitness without being evaluated. `parsimony` adds a size penalty (per
+        node) to the fitness used in selection."""
+        assert sampler is None or evaluator is None, "Panic: A parallel evaluator can't use mini-batches"
+        assert compiler is None or sampler is not None, "Panic: A compiler is only used to re-score the elites"
+
+        def evaluate(individuals, X, y):
+            if evaluator is None:
+                return self.fitness(individuals, X, y)
+            self.fitness_evaluations += len(individuals)
+            return evaluator(individuals)
+
+        def batch_fitness(individuals, X, y):
+            if cache is None:
+                return evaluate(individuals, X, y)
+            return cache.fitness(individuals, lambda i: evaluate(i, X, y))
+
+        def screened_fitness(individuals, X, y):
+            if screen is None:
+                return batch_fitness(individuals, X, y)
+            mask = screen.screen(individuals)
+            result = np.full(len(individuals), np.inf)
+            if mask.any():
+                result[mask] = batch_fitness([i for i, m in zip(individuals, mask) if m], X, y)
+            return result
+
+        X_batch, y_batch = (X, y) if sampler is None else sampler.batch(X, y, 0)
+        population = self.ramped_half_and_half(population_size, max_depth=max_depth)
+        fitness = screened_fitness(population, X_batch, y_batch)
+        best, best_fitness = None, np.inf
+        self.history = list()
+        for generation in range(generations):
+            start, evaluations = time.perf_counter(), self.fitness_evaluations
+            if screen is not None:
+                rejected = screen.rejected
+            if simplifier is not None:
+                nodes_before, nodes_after = simplifier.nodes_before, simplifier.nodes_after
+            if parsimony:
+                selection_fitness = fitness + parsimony * np.array([len(i) for i in population])
+            else:
+                selection_fitness = fitness
+            elite = np.argsort(selection_fitness)[:elitism]
+            offspring = [population[i] for i in elite]
+            offspring_fitness = [fitness[i] for i in elite]
+            new_offspring = list()
+            while len(offspring) + len(new_offspring) < population_size:
+                parent = self.tournament(selection_fitness, tournament_size)
+                child = population[parent]
+                if self._random.random() < p_xover:
+                    child = self.xover(child, population[self.tournament(selection_fitness, tournament_size)])
+                if self._random.random() < p_mutation:
+                    child = self.mutate(child)
+                if child is population[parent]:
+                    # plain reproduction: fitness is already known
+                    offspring.append(child)
+                    offspring_fitness.append(fitness[parent])
+                elif child.depth > max_depth_limit:
+                    offspring.append(population[parent])
+                    offspring_fitness.append(fitness[parent])
+                else:
+                    new_offspring.append(child)
+            if simplifier is not None:
+                originals, new_offspring = new_offspring, [simplifier(i) for i in new_offspring]
+                time_before, time_after = simplifier.measure(
+                    originals, new_offspring, lambda i: self.evaluate(i, X_batch)
+                )
+            population = offspring + new_offspring
+            if sampler is not None and generation > 0 and not sampler.same_batch(generation - 1, generation):
+                # new batch: fitness values of the survivors are no longer comparable, all scored once
+                X_batch, y_batch = sampler.batch(X, y, generation)
+                if cache is not None:
+                    cache.clear()
+                fitness = screened_fitness(population, X_batch, y_batch)
+            else:
+                fitness = np.concatenate((offspring_fitness, screened_fitness(new_offspring, X_batch, y_batch)))
+            self.history.append(
+                {
+                    'generation': generation,
+                    'best_fitness': float(fitness.min()),
+                    'mean_size': float(np.mean([len(i) for i in population])),
+                }
+            )
+            if simplifier is not None and simplifier.nodes_before > nodes_before:
+                self.history[-1]['size_reduction'] = 1 - (simplifier.nodes_after - nodes_after) / (
+                    simplifier.nodes_before - nodes_before
+                )
+            if simplifier is not None and time_before > 0:
+                self.history[-1]['eval_time_reduction'] = 1 - time_after / time_before
+
+            if sampler is not None:
+                if sampler.rescore(generation) or generation == generations - 1:
+                    elite = np.argsort(fitness)[: sampler.n_elites]
+                    if compiler is None:
+                        full_fitness = self.fitness([population[i] for i in elite], X, y)
+                    else:
+                        full_fitness = compiler.fitness([population[i] for i in elite], X, y)
+                        self.fitness_evaluations += len(elite)
+                    if full_fitness.min() < best_fitness:
+                        best, best_fitness = population[elite[np.argmin(full_fitness)]], float(full_fitness.min())
+                    self.history[-1]['full_fitness'] = best_fitness
+
+            elapsed = time.perf_counter() - start
+            self.history[-1]['evaluations'] = self.fitness_evaluations - evaluations
+            self.history[-1]['evaluations_per_second'] = (
+                (self.fitness_evaluations - evaluations) / elapsed if elapsed else 0.0
+            )
+            if screen is not None:
+                self.history[-1]['evaluations_saved'] = screen.rejected - rejected
+            if cache is not None:
+                self.history[-1]['cache_hit_rate'] = cache.end_generation()['hit_rate']
+            if verbose:
+                print(self.history[-1])
+        if best is not None:
+            return best
+        # no sampler, no generations, or no elite with a finite fitness on the full data set
+        return population[int(np.argmin(fitness))]
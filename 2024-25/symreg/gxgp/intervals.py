@@ -0,0 +1,261 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import math
+from typing import Collection
+
+import numpy as np
+
+from .node import Node
+from .registry import operator_registry, protected_divide, protected_log, protected_sqrt
+
+__all__ = ['IntervalScreen', 'VALID', 'MAYBE', 'INVALID']
+
+VALID = 'valid'
+MAYBE = 'maybe'
+INVALID = 'invalid'
+
+# An interval is a (lower, upper) tuple of np.float64; NAN means "not a number on every point"
+_FULL = (np.float64(-np.inf), np.float64(np.inf))
+_NAN = (np.float64(np.nan), np.float64(np.nan))
+
+
+def _is_nan(a) -> bool:
+    return a[0] != a[0]
+
+
+def _hull(points: list) -> tuple[tuple, bool]:
+    """Smallest interval containing the points (a NaN point makes the bounds unknown)"""
+    if any(p != p for p in points):
+        return _FULL, True
+    return (min(points), max(points)), False
+
+
+def _monotone(f):
+    """Interval extension of a non-decreasing function defined everywhere"""
+    return lambda a: ((f(a[0]), f(a[1])), False)
+
+
+def _add(a, b):
+    return _hull([a[0] + b[0], a[1] + b[1]])
+
+
+def _subtract(a, b):
+    return _hull([a[0] - b[1], a[1] - b[0]])
+
+
+def _multiply(a, b):
+    return _hull([a[0] * b[0], a[0] * b[1], a[1] * b[0], a[1] * b[1]])
+
+
+def _divide(a, b):
+    if b[0] > 0 or b[1] < 0:
+        return _hull([a[0] / b[0], a[0] / b[1], a[1] / b[0], a[1] / b[1]])
+    # the divisor may be zero
+    return _FULL, True
+
+
+def _negative(a):
+    return (-a[1], -a[0]), False
+
+
+def _absolute(a):
+    if a[0] >= 0:
+        return a, False
+    if a[1] <= 0:
+        return (-a[1], -a[0]), False
+    return (np.float64(0.0), max(-a[0], a[1])), False
+
+
+def _square(a):
+    lower, upper = _absolute(a)[0]
+    return (lower * lower, upper * upper), False
+
+
+def _log(f):
+    def log(a):
+        if a[1] < 0:
+            # guaranteed domain error
+            return _NAN, True
+        if a[0] <= 0:
+            return (np.float64(-np.inf), f(a[1])), True
+        return (f(a[0]), f(a[1])), False
+
+    return log
+
+
+def _sqrt(a):
+    if a[1] < 0:
+        return _NAN, True
+    if a[0] < 0:
+        return (np.float64(0.0), np.sqrt(a[1])), True
+    return (np.sqrt(a[0]), np.sqrt(a[1])), False
+
+
+def _sin(a):
+    if not (np.isfinite(a[0]) and np.isfinite(a[1])):
+        return (np.float64(-1.0), np.float64(1.0)), True
+    points = [np.sin(a[0]), np.sin(a[1])]
+    # maxima in pi/2 + 2k pi, minima in -pi/2 + 2k pi
+    if math.floor((a[1] - math.pi / 2) / (2 * math.pi)) >= math.ceil((a[0] - math.pi / 2) / (2 * math.pi)):
+        points.append(np.float64(1.0))
+    if math.floor((a[1] + math.pi / 2) / (2 * math.pi)) >= math.ceil((a[0] + math.pi / 2) / (2 * math.pi)):
+        points.append(np.float64(-1.0))
+    return (min(points), max(points)), False
+
+
+def _cos(a):
+    return _sin((a[0] + math.pi / 2, a[1] + math.pi / 2))
+
+
+def _power(a, b):
+    if a[0] > 0:
+        return _hull([a[0] ** b[0], a[0] ** b[1], a[1] ** b[0], a[1] ** b[1]])
+    if a[1] < 0 and b[0] == b[1] and b[0] != math.floor(b[0]):
+        # negative base, fractional exponent
+        return _NAN, True
+    return _FULL, True
+
+
+def _maximum(a, b):
+    return (max(a[0], b[0]), max(a[1], b[1])), False
+
+
+def _minimum(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1])), False
+
+
+def _protected_divide(a, b):
+    if b[0] > 1e-12 or b[1] < -1e-12:
+        return _divide(a, b)
+    return _FULL, False
+
+
+def _protected_log(a):
+    lower, upper = _absolute(a)[0]
+    if lower > 0:
+        return (np.log(lower), np.log(upper)), False
+    return (np.float64(-np.inf), max(np.log(upper), np.float64(0.0))), False
+
+
+def _protected_sqrt(a):
+    return _sqrt(_absolute(a)[0])
+
+
+# vectorized implementation -> (interval extension, True if NaN arguments give NaN)
+_EXTENSIONS = {
+    np.add: (_add, True),
+    np.subtract: (_subtract, True),
+    np.multiply: (_multiply, True),
+    np.divide: (_divide, True),
+    np.negative: (_negative, True),
+    np.absolute: (_absolute, True),
+    np.square: (_square, True),
+    np.exp: (_monotone(np.exp), True),
+    np.tanh: (_monotone(np.tanh), True),
+    np.arctan: (_monotone(np.arctan), True),
+    np.sinh: (_monotone(np.sinh), True),
+    np.cbrt: (_monotone(np.cbrt), True),
+    np.log: (_log(np.log), True),
+    np.log2: (_log(np.log2), True),
+    np.log10: (_log(np.log10), True),
+    np.sqrt: (_sqrt, True),
+    np.sin: (_sin, True),
+    np.cos: (_cos, True),
+    np.power: (_power, False),  # nan ** 0 is 1
+    np.maximum: (_maximum, True),
+    np.minimum: (_minimum, True),
+    protected_divide: (_protected_divide, False),
+    protected_log: (_protected_log, True),
+    protected_sqrt: (_protected_sqrt, True),
+}
+
+
+class IntervalScreen:
+    """Static analysis of individuals with interval arithmetic over the bounds of the input variables
+
+    The interval of a node encloses all the values it takes for inputs inside the bounds (e.g., the min and
+    max of each column of the training set). An individual is INVALID if it is guaranteed to produce a
+    non-finite result for every input, and thus its fitness is infinite without evaluating it; it's MAYBE if
+    a domain error (e.g., a division by an interval containing zero) or an unbounded output is possible.
+    With `strict`, MAYBE individuals are rejected too (as Keijzer, 2003). Intervals are cached on the nodes
+    themselves, thus offspring only analyze the path changed by the variation."""
+
+    def __init__(self, X, variables: int | Collection, *, strict: bool = False):
+        if isinstance(variables, int):
+            names = [f'x{i}' for i in range(variables)]
+        else:
+            names = list(variables)
+        X = np.asarray(X, dtype=np.float64)
+        self._bounds = {
+            n: (np.float64(lo), np.float64(hi)) for n, lo, hi in zip(names, np.nanmin(X, axis=0), np.nanmax(X, axis=0))
+        }
+        self._strict = strict
+        self._tag = object()
+        self.screened = 0
+        self.rejected = 0
+
+    def __str__(self):
+        return f'IntervalScreen(screened={self.screened}, rejected={self.rejected})'
+
+    def interval(self, node: Node) -> tuple[float, float]:
+        """Return the bounds of the output of `node` (NaN, NaN if it's never a number)"""
+        with np.errstate(all='ignore'):
+            return self._interval(node)[0]
+
+    def status(self, node: Node) -> str:
+        with np.errstate(all='ignore'):
+            (lower, upper), maybe = self._interval(node)
+        if lower != lower or lower == upper == np.inf or lower == upper == -np.inf:
+            return INVALID
+        if maybe or not (np.isfinite(lower) and np.isfinite(upper)):
+            return MAYBE
+        return VALID
+
+    def screen(self, individuals: list[Node]) -> np.ndarray:
+        """Return a boolean mask of the individuals worth evaluating"""
+        rejected = (INVALID, MAYBE) if self._strict else (INVALID,)
+        mask = np.array([self.status(i) not in rejected for i in individuals], dtype=bool)
+        self.screened += len(individuals)
+        self.rejected += int(len(individuals) - mask.sum())
+        return mask
+
+    def _interval(self, node: Node) -> tuple[tuple, bool]:
+        if node._interval is not None and node._interval[0] is self._tag:
+            return node._interval[1]
+        if node._op is None:
+            if isinstance(node._value, str):
+                result = self._bounds[node._value], False
+            else:
+                value = np.float64(node._value)
+                result = (value, value), not np.isfinite(value)
+        else:
+            successors = [self._interval(c) for c in node._successors]
+            args = [s[0] for s in successors]
+            maybe = any(s[1] for s in successors)
+            result = IntervalScreen._apply(operator_registry[node._op_id], args, maybe)
+            result = result[0], result[1] or maybe
+        node._interval = (self._tag, result)
+        return result
+
+    @staticmethod
+    def _apply(operator, args: list[tuple], maybe: bool) -> tuple[tuple, bool]:
+        extension, nan_propagates = _EXTENSIONS.get(operator.vectorized, (None, False))
+        if any(_is_nan(a) for a in args):
+            return (_NAN, True) if nan_propagates else (_FULL, True)
+        if maybe and not nan_propagates:
+            # e.g., protected_divide(x, nan) is 1: the intervals of the arguments (which ignore the NaNs) aren't enough
+            return _FULL, True
+        if all(a[0] == a[1] for a in args):
+            # constant arguments: the result is exact
+            try:
+                value = np.float64(operator.vectorized(*[a[0] for a in args]))
+            except (ArithmeticError, TypeError, ValueError):
+                return _FULL, True
+            return (value, value), not np.isfinite(value)
+        if extension is None:
+            return _FULL, True
+        return extension(*args)
@@ -0,0 +1,192 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import multiprocessing
+import queue
+import time
+import traceback
+from typing import Collection
+
+import numpy as np
+
+from .gp_common import xover_swap_subtree
+from .gp_dag import DagGP
+from .node import Node
+from .postfix import PostfixCodec, PostfixPopulation
+from .random import RandomStreams
+
+__all__ = ['IslandModel']
+
+
+# Keys of the random streams
+_STREAM_ISLAND = 0
+_STREAM_MIGRATION = 1
+
+
+def _destinations(topology: str, n_islands: int, streams: RandomStreams, epoch: int) -> list[int]:
+    """Return where each island sends its emigrants; every island receives from exactly one other"""
+    if topology == 'ring':
+        return [(i + 1) % n_islands for i in range(n_islands)]
+    # random: a cyclic permutation drawn identically by all islands, so that no one waits forever
+    order = list(range(n_islands))
+    streams.random(_STREAM_MIGRATION, epoch).shuffle(order)
+    destinations = [0] * n_islands
+    for i, island in enumerate(order):
+        destinations[island] = order[(i + 1) % n_islands]
+    return destinations
+
+
+def _mse(individual: Node, X, y) -> float:
+    value = DagGP.mse(individual, X, y, vectorized=True)
+    return value if np.isfinite(value) else np.inf
+
+
+def _island(island: int, inboxes: list, results, config: dict, X, y):
+    try:
+        _evolve_island(island, inboxes, results, config, X, y)
+    except Exception:
+        # the parent terminates the other islands, which may be waiting for emigrants from this one
+        results.put({'island': island, 'error': traceback.format_exc()})
+
+
+def _evolve_island(island: int, inboxes: list, results, config: dict, X, y):
+    streams = RandomStreams(config['seed'])
+    rng = streams.random(_STREAM_ISLAND, island)
+    dag = DagGP(config['operators'], config['variables'], config['constants'], rng=rng)
+    codec = PostfixCodec(config['operators'], config['variables'])
+
+    start = time.perf_counter()
+    population = [dag.create_individual(config['individual_size']) for _ in range(config['population_size'])]
+    fitness = [_mse(i, X, y) for i in population]
+    evaluations, migrations = len(population), 0
+
+    def tournament():
+        return min(rng.sample(range(len(population)), k=config['tournament_size']), key=lambda i: fitness[i])
+
+    for generation in range(config['generations']):
+        offspring = list()
+        for _ in range(config['offspring_size']):
+            donor = population[tournament()]
+            if rng.random() < config['p_mutation']:
+                # no mutation in DagGP: crossover with a brand new individual
+                donor = dag.create_individual(config['individual_size'])
+            offspring.append(xover_swap_subtree(population[tournament()], donor, rng=rng))
+        offspring_fitness = [_mse(i, X, y) for i in offspring]
+        evaluations += len(offspring)
+        everybody, everybody_fitness = population + offspring, fitness + offspring_fitness
+        ranking = np.argsort(everybody_fitness, kind='stable')[: config['population_size']]
+        population = [everybody[i] for i in ranking]
+        fitness = [everybody_fitness[i] for i in ranking]
+
+        if (generation + 1) % config['migration_interval'] == 0 and len(inboxes) > 1:
+            epoch = (generation + 1) // config['migration_interval']
+            destination = _destinations(config['topology'], len(inboxes), streams, epoch)[island]
+            emigrants = [codec.encode(i) for i in population[: config['migration_size']]]
+            inboxes[destination].put((PostfixPopulation(emigrants), fitness[: config['migration_size']]))
+            # synchronous migration: runs are reproducible regardless of the speed of the islands
+            immigrants, immigrants_fitness = inboxes[island].get()
+            n = len(immigrants)
+            population[-n:] = [codec.decode(p) for p in immigrants]
+            fitness[-n:] = immigrants_fitness
+            migrations += 1
+    elapsed = time.perf_counter() - start
+
+    best = int(np.argmin(fitness))
+    results.put(
+        {
+            'island': island,
+            'best': PostfixPopulation([codec.encode(population[best])]),
+            'best_fitness': float(fitness[best]),
+            'evaluations': evaluations,
+            'migrations': migrations,
+            'elapsed': elapsed,
+            'evaluations_per_second': evaluations / elapsed if elapsed else 0.0,
+        }
+    )
+
+
+class IslandModel:
+    """Island-model GP: each process evolves its own `DagGP` population and periodically exchanges elites
+
+    Emigrants travel as packed postfix programs (with their fitness, which is not recomputed) over a
+    'ring' or 'random' topology. Each island draws from its own independent stream of `RandomStreams(seed)`,
+    thus runs are reproducible. Operators must be picklable (e.g., NumPy ufuncs, not lambdas)."""
+
+    def __init__(
+        self,
+        operators: Collection,
+        variables: int | Collection,
+        constants: int | Collection,
+        *,
+        n_islands: int = 4,
+        population_size: int = 100,
+        offspring_size: int = None,
+        individual_size: int = 10,
+        generations: int = 50,
+        tournament_size: int = 3,
+        p_mutation: float = 0.1,
+        migration_interval: int = 10,
+        migration_size: int = 2,
+        topology: str = 'ring',
+        seed: int = 42,
+    ):
+        assert topology in ('ring', 'random'), f"Panic: Unknown topology '{topology}'"
+        assert 0 < migration_size <= population_size, "Panic: Invalid migration size"
+        self._n_islands = n_islands
+        self._config = {
+            'operators': list(operators),
+            'variables': variables if isinstance(variables, int) else list(variables),
+            'constants': constants if isinstance(constants, int) else list(constants),
+            'population_size': population_size,
+            'offspring_size': offspring_size or population_size,
+            'individual_size': individual_size,
+            'generations': generations,
+            'tournament_size': tournament_size,
+            'p_mutation': p_mutation,
+            'migration_interval': migration_interval,
+            'migration_size': migration_size,
+            'topology': topology,
+            'seed': seed,
+        }
+        self.islands = list()
+
+    def run(self, X, y) -> tuple[Node, float]:
+        """Evolve all islands in parallel, return the best individual overall and its MSE"""
+        inboxes = [multiprocessing.Queue() for _ in range(self._n_islands)]
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_island, args=(i, inboxes, results, self._config, X, y))
+            for i in range(self._n_islands)
+        ]
+        for p in processes:
+            p.start()
+        try:
+            islands = dict()
+            while len(islands) < len(processes):
+                try:
+                    result = results.get(timeout=0.1)
+                except queue.Empty:
+                    for i, p in enumerate(processes):
+                        if i not in islands and not p.is_alive() and p.exitcode != 0:
+                            raise RuntimeError(f"Island {i} died with exit code {p.exitcode}")
+                    continue
+                if 'error' in result:
+                    raise RuntimeError(f"Island {result['island']} failed:\n{result['error']}")
+                islands[result['island']] = result
+        except BaseException:
+            for p in processes:
+                p.terminate()
+            raise
+        finally:
+            for p in processes:
+                p.join()
+        self.islands = [islands[i] for i in range(len(processes))]
+
+        codec = PostfixCodec(self._config['operators'], self._config['variables'])
+        for island in self.islands:
+            island['best'] = codec.decode(island['best'][0])
+        best = min(self.islands, key=lambda r: r['best_fitness'])
+        return best['best'], best['best_fitness']
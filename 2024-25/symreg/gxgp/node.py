@@ -8,61 +8,151 @@ import numbers
 import warnings
 from typing import Callable
 
+from .context import EvalContext
 from .draw import draw
-from .utils import arity
+from .registry import operator_registry
 
-__all__ = ['Node']
+__all__ = ['Node', 'StructuralKey']
+
+
+class StructuralKey:
+    """Exact identity of an expression, equal for identical or trivially equivalent (commuted) expressions
+
+    The hash is computed once, but equality compares the whole structure (shared subexpressions are compared
+    by identity), thus keys can be safely used in dictionaries even when hashes collide."""
+
+    __slots__ = ('_signature', '_hash')
+
+    def __init__(self, signature: tuple):
+        self._signature = signature
+        self._hash = hash(signature)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, StructuralKey):
+            return NotImplemented
+        return self._hash == other._hash and self._signature == other._signature
 
 
 class Node:
     _func: Callable
+    _vfunc: Callable
     _successors: tuple['Node']
     _arity: int
     _str: str
+    _op: Callable | None
+    _op_id: int | None
+    _value: numbers.Number | str | None
+    _size: int
+    _depth: int
+    _key: StructuralKey
+    _hash: int
+    _semantics: tuple | None
+    _interval: tuple | None
 
     def __init__(self, node=None, successors=None, *, name=None):
         if callable(node):
-
-            def _f(*_args, **_kwargs):
-                return node(*_args)
-
-            self._func = _f
+            operator = operator_registry.get(node)
+            self._func = operator.call
+            self._vfunc = operator.vcall
+            self._op = node
+            self._op_id = operator.id
+            self._value = None
             self._successors = tuple(successors)
-            self._arity = arity(node)
-            assert self._arity is None or len(tuple(successors)) == self._arity, (
+            self._arity = operator.arity
+            assert self._arity is None or len(self._successors) == self._arity, (
                 "Panic: Incorrect number of children."
-                + f" Expected {len(tuple(successors))} found {arity(node)}"
+                + f" Expected {len(self._successors)} found {self._arity}"
             )
             self._leaf = False
-            assert all(isinstance(s, Node) for s in successors), "Panic: Successors must be `Node`"
-            self._successors = tuple(successors)
-            if name is not None:
-                self._str = name
-            elif node.__name__ == '<lambda>':
-                self._str = 'λ'
-            else:
-                self._str = node.__name__
+            assert all(isinstance(s, Node) for s in self._successors), "Panic: Successors must be `Node`"
+            self._str = name if name is not None else operator.name
         elif isinstance(node, numbers.Number):
             self._func = eval(f'lambda **_kw: {node}')
+            self._vfunc = self._func
+            self._op = None
+            self._op_id = None
+            self._value = node
             self._successors = tuple()
             self._arity = 0
             self._str = f'{node:g}'
         elif isinstance(node, str):
             self._func = eval(f'lambda *, {node}, **_kw: {node}')
+            self._vfunc = self._func
+            self._op = None
+            self._op_id = None
+            self._value = node
             self._successors = tuple()
             self._arity = 0
             self._str = str(node)
         else:
             assert False
+        self._update_cache()
+
+    def _update_cache(self):
+        # Nodes are immutable, thus size, depth and structural key can be computed once
+        self._size = 1 + sum(c._size for c in self._successors)
+        self._depth = max((c._depth + 1 for c in self._successors), default=0)
+        if self._op is None:
+            self._key = StructuralKey((type(self._value) is str, self._value))
+        else:
+            operator = operator_registry[self._op_id]
+            keys = tuple(c._key for c in self._successors)
+            if operator.commutative:
+                keys = tuple(sorted(keys, key=hash))
+            self._key = StructuralKey((operator.vectorized, keys))
+        self._hash = self._key._hash
+        # output on the training data, lazily cached by `Semantics`; a clone gets a new structure, thus a new cache
+        self._semantics = None
+        self._interval = None
+
+    def _with_successors(self, successors) -> 'Node':
+        """Return a shallow clone of the node with different successors (no introspection)"""
+        assert len(successors) == len(self._successors), "Panic: Incorrect number of children"
+        clone = object.__new__(Node)
+        clone.__dict__.update(self.__dict__)
+        clone._successors = tuple(successors)
+        clone._update_cache()
+        return clone
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # immutable: copies can safely share the very same object
+        return self
 
     def __call__(self, **kwargs):
-        return self._func(*[c(**kwargs) for c in self._successors], **kwargs)
+        return EvalContext().evaluate(self, kwargs)
+
+    def vectorized(self, **kwargs):
+        """Evaluate the expression once on whole NumPy arrays, using ufuncs where possible"""
+        return EvalContext().evaluate(self, kwargs, vectorized=True)
 
     def __str__(self):
         return self.long_name
 
     def __len__(self):
-        return 1 + sum(len(c) for c in self._successors)
+        """Number of nodes in the (tree-expanded) expression"""
+        return self._size
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def structural_hash(self):
+        """Hash of the expression, equal for identical or trivially equivalent (commuted) expressions"""
+        return self._hash
+
+    @property
+    def structural_key(self) -> StructuralKey:
+        """Exact key of the expression, unlike `structural_hash` it never collides with a different one"""
+        return self._key
 
     @property
     def value(self):
@@ -76,11 +166,6 @@ class Node:
     def successors(self):
         return list(self._successors)
 
-    @successors.setter
-    def successors(self, new_successors):
-        assert len(new_successors) == len(self._successors)
-        self._successors = tuple(new_successors)
-
     @property
     def is_leaf(self):
         return not self._successors
@@ -102,6 +187,38 @@ class Node:
         _get_subtree(result, self)
         return result
 
+    def path_to(self, index: int) -> list[int]:
+        """Return the successor indexes leading to the `index`-th node in pre-order, in O(depth)"""
+        assert 0 <= index < self._size, "Panic: Node index out of range"
+        path = list()
+        node = self
+        while index:
+            index -= 1
+            for i, c in enumerate(node._successors):
+                if index < c._size:
+                    path.append(i)
+                    node = c
+                    break
+                index -= c._size
+        return path
+
+    def get(self, path: list[int]) -> 'Node':
+        node = self
+        for i in path:
+            node = node._successors[i]
+        return node
+
+    def replace(self, path: list[int], new_node: 'Node') -> 'Node':
+        """Return a new expression with the node at `path` replaced, sharing all untouched subtrees"""
+        ancestors = [self]
+        for i in path[:-1]:
+            ancestors.append(ancestors[-1]._successors[i])
+        for node, i in zip(reversed(ancestors), reversed(path)):
+            successors = list(node._successors)
+            successors[i] = new_node
+            new_node = node._with_successors(successors)
+        return new_node
+
     def draw(self):
         try:
             return draw(self)
@@ -0,0 +1,156 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Collection
+
+import numpy as np
+
+from .context import EvalContext
+from .node import Node
+
+__all__ = ['ConstantOptimizer', 'linear_scaling']
+
+
+def linear_scaling(y_pred: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    """Return (a, b) minimizing the squared error of a + b * y_pred"""
+    variance = np.var(y_pred)
+    b = np.cov(y_pred, y, bias=True)[0, 1] / variance if variance > 0 else 0.0
+    a = np.mean(y) - b * np.mean(y_pred)
+    return float(a), float(b)
+
+
+def _constants(node: Node, bunch: dict):
+    """Collect the distinct constant leaves (a constant shared in a DAG is a single parameter)"""
+    if node._op is None:
+        if not isinstance(node._value, str):
+            bunch[id(node)] = node
+    else:
+        for c in node._successors:
+            _constants(c, bunch)
+
+
+def _replace(node: Node, replacement: dict, memo: dict) -> Node:
+    if id(node) in replacement:
+        return replacement[id(node)]
+    if node.is_leaf:
+        return node
+    if id(node) not in memo:
+        memo[id(node)] = node._with_successors([_replace(c, replacement, memo) for c in node._successors])
+    return memo[id(node)]
+
+
+class ConstantOptimizer:
+    """Tune the numeric leaves of an individual with linear scaling and a least-squares fit
+
+    Results are cached by structural key and data set (a digest of X and y, computed once for consecutive
+    calls on the same arrays), thus each individual is optimized at most once per data set. The cost of the
+    optimization is tracked separately from regular fitness calls: `evaluations` counts the evaluations of
+    the expression on the whole data set, `elapsed` the time spent."""
+
+    def __init__(
+        self,
+        variables: int | Collection,
+        *,
+        linear: bool = True,
+        max_evaluations: int = 100,
+        cache_size: int = 10_000,
+    ):
+        if isinstance(variables, int):
+            self._variable_names = [f'x{i}' for i in range(variables)]
+        else:
+            self._variable_names = list(variables)
+        self._linear = linear
+        self._max_evaluations = max_evaluations
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._data = None
+        self.optimizations = 0
+        self.cache_hits = 0
+        self.evaluations = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (
+            f'ConstantOptimizer(optimizations={self.optimizations}, cache_hits={self.cache_hits}, '
+            + f'evaluations={self.evaluations}, elapsed={self.elapsed:.3g}s)'
+        )
+
+    def __call__(self, individual: Node, X, y) -> tuple[Node, float]:
+        """Return the optimized individual and its MSE"""
+        key = individual.structural_key, self._fingerprint(X, y)
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        start = time.perf_counter()
+        result = self._optimize(individual, X, np.asarray(y))
+        self.elapsed += time.perf_counter() - start
+        self.optimizations += 1
+
+        self._cache[key] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _fingerprint(self, X, y) -> bytes:
+        """Return a digest of the data set; the last one is remembered, thus mini-batches are hashed once"""
+        if self._data is not None and self._data[0] is X and self._data[1] is y:
+            return self._data[2]
+        digest = hashlib.blake2b(digest_size=16)
+        for a in (np.asarray(X), np.asarray(y)):
+            digest.update(f'{a.dtype.str}{a.shape}'.encode())
+            digest.update(np.ascontiguousarray(a).data)
+        self._data = X, y, digest.digest()
+        return self._data[2]
+
+    def _optimize(self, individual: Node, X, y) -> tuple[Node, float]:
+        variables = dict(zip(self._variable_names, np.ascontiguousarray(np.asarray(X).T)))
+        leaves = dict()
+        _constants(individual, leaves)
+        leaves = list(leaves.values())
+        context = EvalContext()
+
+        def predict(values):
+            self.evaluations += 1
+            with np.errstate(all='ignore'):
+                y_pred = context.evaluate(individual, variables, vectorized=True, values=dict(zip(leaves, values)))
+            return np.broadcast_to(y_pred, y.shape)
+
+        def residuals(values):
+            y_pred = predict(values)
+            if self._linear:
+                a, b = linear_scaling(y_pred, y)
+                y_pred = a + b * y_pred
+            r = y - y_pred
+            # the optimizer can't cope with NaNs: invalid points are heavily penalized
+            r[~np.isfinite(r)] = 1e100
+            return r
+
+        initial = np.array([float(n._value) for n in leaves])
+        y_pred = predict(initial)
+        if not np.all(np.isfinite(y_pred)):
+            with np.errstate(all='ignore'):
+                return individual, float(np.mean(np.square(y - y_pred)))
+
+        values = initial
+        if leaves:
+            from scipy.optimize import least_squares
+
+            fit = least_squares(residuals, initial, max_nfev=self._max_evaluations)
+            if np.all(np.isfinite(fit.x)) and np.all(np.isfinite(predict(fit.x))):
+                values = fit.x
+
+        optimized = _replace(individual, {id(n): Node(float(v)) for n, v in zip(leaves, values)}, dict())
+        y_pred = predict(values)
+        if self._linear:
+            a, b = linear_scaling(y_pred, y)
+            optimized = Node(np.add, [Node(a), Node(np.multiply, [Node(b), optimized])])
+            y_pred = a + b * y_pred
+        return optimized, float(np.mean(np.square(y - y_pred)))
@@ -0,0 +1,113 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Collection
+
+import numpy as np
+
+from .node import Node
+from .postfix import PostfixCodec, PostfixPopulation
+
+__all__ = ['ParallelEvaluator']
+
+# Per-process state of the workers, set once by `_init_worker`
+_worker = dict()
+
+
+def _attach(name: str, shape: tuple, dtype: str):
+    # the segment is owned, and eventually unlinked, by the parent process
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(columns_spec, y_spec, operators, variable_names):
+    _worker['columns_shm'], _worker['columns'] = _attach(*columns_spec)
+    _worker['y_shm'], _worker['y'] = _attach(*y_spec)
+    _worker['codec'] = PostfixCodec(operators, variable_names)
+
+
+def _mse_chunk(population: PostfixPopulation) -> np.ndarray:
+    codec, columns, y = _worker['codec'], _worker['columns'], _worker['y']
+    result = np.empty(len(population))
+    with np.errstate(all='ignore'):
+        for i, program in enumerate(population):
+            result[i] = np.mean(np.square(y - codec.evaluate_columns(program, columns)))
+    result[~np.isfinite(result)] = np.inf
+    return result
+
+
+class ParallelEvaluator:
+    """Compute the MSE of batches of individuals on a pool of worker processes
+
+    The dataset is copied once into shared memory and mapped by all workers; individuals travel as packed
+    postfix programs. Results are returned in order and do not depend on the number of workers. Operators
+    must be picklable (e.g., NumPy ufuncs or module-level functions, not lambdas)."""
+
+    def __init__(
+        self,
+        operators: Collection,
+        variables: int | Collection,
+        X,
+        y,
+        *,
+        n_workers: int = None,
+        chunk_size: int = None,
+    ):
+        self._codec = PostfixCodec(operators, variables)
+        self._n_workers = n_workers or os.cpu_count()
+        self._chunk_size = chunk_size
+        self.fitness_evaluations = 0
+
+        columns = np.ascontiguousarray(np.asarray(X, dtype=np.float64).T)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        assert len(columns) == len(self._codec.variable_names), "Panic: Incorrect number of variables"
+        self._columns_shm, columns_spec = ParallelEvaluator._share(columns)
+        self._y_shm, y_spec = ParallelEvaluator._share(y)
+        self._pool = multiprocessing.Pool(
+            self._n_workers,
+            initializer=_init_worker,
+            initargs=(columns_spec, y_spec, self._codec.operators, self._codec.variable_names),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _share(array: np.ndarray):
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return shm, (shm.name, array.shape, array.dtype.str)
+
+    @property
+    def n_workers(self):
+        return self._n_workers
+
+    def fitness(self, individuals: list[Node]) -> np.ndarray:
+        """Return the MSE of the individuals, in order (invalid results are mapped to +inf)"""
+        if not individuals:
+            return np.empty(0)
+        programs = [self._codec.encode(i) for i in individuals]
+        chunk_size = self._chunk_size or math.ceil(len(programs) / (4 * self._n_workers))
+        chunks = [PostfixPopulation(programs[i : i + chunk_size]) for i in range(0, len(programs), chunk_size)]
+        result = np.concatenate(self._pool.map(_mse_chunk, chunks, chunksize=1))
+        self.fitness_evaluations += len(individuals)
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            for shm in (self._columns_shm, self._y_shm):
+                shm.close()
+                shm.unlink()
@@ -0,0 +1,226 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+from typing import Collection, Sequence
+
+import numpy as np
+
+from .node import Node
+from .random import gxgp_random
+from .registry import numpy_equivalent
+
+__all__ = ['OP_VARIABLE', 'OP_CONSTANT', 'PostfixProgram', 'PostfixPopulation', 'PostfixCodec']
+
+# Opcodes >= 0 are indexes in the operator table of the codec
+OP_VARIABLE = -1
+OP_CONSTANT = -2
+
+OPCODE_DTYPE = np.int16
+ARG_DTYPE = np.int32
+CONSTANT_DTYPE = np.float64
+
+
+class PostfixProgram:
+    """A flat, array-backed expression in postfix order
+
+    For each instruction, `args` holds the index of the variable (`OP_VARIABLE`), the index in `constants`
+    (`OP_CONSTANT`), or the number of operands (operators)."""
+
+    __slots__ = ('opcodes', 'args', 'constants')
+
+    def __init__(self, opcodes, args, constants):
+        self.opcodes = np.asarray(opcodes, dtype=OPCODE_DTYPE)
+        self.args = np.asarray(args, dtype=ARG_DTYPE)
+        self.constants = np.asarray(constants, dtype=CONSTANT_DTYPE)
+        assert len(self.opcodes) == len(self.args), "Panic: Inconsistent program"
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __eq__(self, other: "PostfixProgram"):
+        return (
+            np.array_equal(self.opcodes, other.opcodes)
+            and np.array_equal(self.args, other.args)
+            and np.array_equal(self.constants, other.constants)
+        )
+
+    def __repr__(self):
+        return (
+            f'PostfixProgram(opcodes={self.opcodes.tolist()}, args={self.args.tolist()}, '
+            + f'constants={self.constants.tolist()})'
+        )
+
+    def __getstate__(self):
+        return self.opcodes, self.args, self.constants
+
+    def __setstate__(self, state):
+        self.opcodes, self.args, self.constants = state
+
+    @property
+    def nbytes(self):
+        return self.opcodes.nbytes + self.args.nbytes + self.constants.nbytes
+
+    def subtree_start(self, end: int) -> int:
+        """Return the index of the first instruction of the subtree whose root is at `end`"""
+        needed = 1
+        i = end
+        while True:
+            needed -= 1
+            if self.opcodes[i] >= 0:
+                needed += int(self.args[i])
+            if needed == 0:
+                return i
+            i -= 1
+
+
+class PostfixPopulation:
+    """Many postfix programs packed in a few contiguous NumPy arrays"""
+
+    __slots__ = ('opcodes', 'args', 'constants', 'code_offsets', 'constant_offsets')
+
+    def __init__(self, programs: Sequence[PostfixProgram] = ()):
+        self.code_offsets = np.cumsum([0] + [len(p) for p in programs], dtype=np.int64)
+        self.constant_offsets = np.cumsum([0] + [len(p.constants) for p in programs], dtype=np.int64)
+        if programs:
+            self.opcodes = np.concatenate([p.opcodes for p in programs])
+            self.args = np.concatenate([p.args for p in programs])
+            self.constants = np.concatenate([p.constants for p in programs])
+        else:
+            self.opcodes = np.empty(0, dtype=OPCODE_DTYPE)
+            self.args = np.empty(0, dtype=ARG_DTYPE)
+            self.constants = np.empty(0, dtype=CONSTANT_DTYPE)
+
+    def __len__(self):
+        return len(self.code_offsets) - 1
+
+    def __getitem__(self, i: int) -> PostfixProgram:
+        """Return the i-th program as views over the packed arrays (no copy)"""
+        if not -len(self) <= i < len(self):
+            raise IndexError('PostfixPopulation index out of range')
+        i %= len(self)
+        c0, c1 = self.code_offsets[i], self.code_offsets[i + 1]
+        k0, k1 = self.constant_offsets[i], self.constant_offsets[i + 1]
+        program = PostfixProgram.__new__(PostfixProgram)
+        program.opcodes = self.opcodes[c0:c1]
+        program.args = self.args[c0:c1]
+        program.constants = self.constants[k0:k1]
+        return program
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getstate__(self):
+        return tuple(getattr(self, s) for s in PostfixPopulation.__slots__)
+
+    def __setstate__(self, state):
+        for s, v in zip(PostfixPopulation.__slots__, state):
+            setattr(self, s, v)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, s).nbytes for s in PostfixPopulation.__slots__)
+
+
+class PostfixCodec:
+    """Convert `Node` expressions to and from `PostfixProgram`, and interpret the latter
+
+    Operators are identified by their index in `operators`, variables by their index in `variables`.
+    Note: shared successors in a DAG are expanded, the postfix program encodes the equivalent tree."""
+
+    def __init__(self, operators: Collection, variables: int | Collection):
+        self._operators = list(operators)
+        self._vfuncs = [numpy_equivalent(op) for op in self._operators]
+        self._opcodes = {op: i for i, op in enumerate(self._operators)}
+        if isinstance(variables, int):
+            self._variable_names = [f'x{i}' for i in range(variables)]
+        else:
+            self._variable_names = list(variables)
+        self._variable_indexes = {n: i for i, n in enumerate(self._variable_names)}
+        self._variables = [Node(n) for n in self._variable_names]
+
+    @property
+    def operators(self):
+        return list(self._operators)
+
+    @property
+    def variable_names(self):
+        return list(self._variable_names)
+
+    def encode(self, node: Node) -> PostfixProgram:
+        opcodes, args, constants = list(), list(), list()
+        self._encode(node, opcodes, args, constants)
+        return PostfixProgram(opcodes, args, constants)
+
+    def _encode(self, node: Node, opcodes: list, args: list, constants: list):
+        for c in node._successors:
+            self._encode(c, opcodes, args, constants)
+        if node._op is not None:
+            assert node._op in self._opcodes, f"Panic: Unknown operator {node.short_name}"
+            opcodes.append(self._opcodes[node._op])
+            args.append(len(node._successors))
+        elif isinstance(node._value, str):
+            opcodes.append(OP_VARIABLE)
+            args.append(self._variable_indexes[node._value])
+        else:
+            opcodes.append(OP_CONSTANT)
+            args.append(len(constants))
+            constants.append(node._value)
+
+    def decode(self, program: PostfixProgram) -> Node:
+        stack = list()
+        for op, arg in zip(program.opcodes.tolist(), program.args.tolist()):
+            if op == OP_VARIABLE:
+                stack.append(self._variables[arg])
+            elif op == OP_CONSTANT:
+                stack.append(Node(float(program.constants[arg])))
+            else:
+                params = stack[len(stack) - arg :]
+                del stack[len(stack) - arg :]
+                stack.append(Node(self._operators[op], params))
+        assert len(stack) == 1, "Panic: Malformed program"
+        return stack[0]
+
+    def evaluate(self, program: PostfixProgram, X) -> np.ndarray:
+        """Run the stack machine on whole columns of X (one row per sample, as in `DagGP.evaluate`)"""
+        return self.evaluate_columns(program, np.ascontiguousarray(np.asarray(X).T))
+
+    def evaluate_columns(self, program: PostfixProgram, columns) -> np.ndarray:
+        """Run the stack machine on `columns`, one array per variable"""
+        constants = program.constants.tolist()
+        stack = list()
+        with np.errstate(all='ignore'):
+            for op, arg in zip(program.opcodes.tolist(), program.args.tolist()):
+                if op == OP_VARIABLE:
+                    stack.append(columns[arg])
+                elif op == OP_CONSTANT:
+                    stack.append(constants[arg])
+                elif arg == 1:
+                    stack[-1] = self._vfuncs[op](stack[-1])
+                else:
+                    params = stack[len(stack) - arg :]
+                    del stack[len(stack) - arg :]
+                    stack.append(self._vfuncs[op](*params))
+        assert len(stack) == 1, "Panic: Malformed program"
+        return np.broadcast_to(stack[0], (len(columns[0]),))
+
+    def xover_swap_subtree(self, program1: PostfixProgram, program2: PostfixProgram, *, rng=gxgp_random):
+        """Replace a random subtree of `program1` with a random subtree of `program2` slicing the arrays"""
+        end1 = rng.randrange(len(program1))
+        start1 = program1.subtree_start(end1)
+        end2 = rng.randrange(len(program2))
+        start2 = program2.subtree_start(end2)
+
+        donor = slice(start2, end2 + 1)
+        opcodes = np.concatenate((program1.opcodes[:start1], program2.opcodes[donor], program1.opcodes[end1 + 1 :]))
+        donor_args = np.where(
+            program2.opcodes[donor] == OP_CONSTANT, program2.args[donor] + len(program1.constants), program2.args[donor]
+        )
+        args = np.concatenate((program1.args[:start1], donor_args, program1.args[end1 + 1 :]))
+        # donor constants are renumbered after the receiver's ones, then unused constants are dropped
+        is_constant = opcodes == OP_CONSTANT
+        constants = np.concatenate((program1.constants, program2.constants))[args[is_constant]]
+        args[is_constant] = np.arange(len(constants), dtype=ARG_DTYPE)
+        return PostfixProgram(opcodes, args, constants)
@@ -8,3 +8,34 @@ import random
 
 assert "gxgp_random" not in globals(), "Paranoia check: gxgp_random already initialized"
 gxgp_random = random.Random(42)
+
+
+class RandomStreams:
+    """Statistically independent random generators, all derived from a single master seed
+
+    Streams are identified by a key (a tuple of non-negative integers, e.g., `(island,)` or `(island, batch)`),
+    thus the same key always yields the same sequence regardless of how many streams are created, and in
+    which order. Each call returns a brand new generator: workers never share state."""
+
+    def __init__(self, seed: int = 42):
+        self._seed = seed
+
+    @property
+    def seed(self):
+        return self._seed
+
+    def _sequence(self, key):
+        import numpy as np
+
+        return np.random.SeedSequence(self._seed, spawn_key=tuple(key))
+
+    def random(self, *key: int) -> random.Random:
+        """Return a `random.Random` for the stream `key`"""
+        state = self._sequence(key).generate_state(4, dtype='uint64')
+        return random.Random(int.from_bytes(state.tobytes(), 'little'))
+
+    def numpy(self, *key: int):
+        """Return a `numpy.random.Generator` for the stream `key`"""
+        import numpy as np
+
+        return np.random.default_rng(self._sequence(key))
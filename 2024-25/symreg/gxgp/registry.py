@@ -0,0 +1,166 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import math
+import operator
+from typing import Callable
+
+import numpy as np
+
+from .utils import arity
+
+__all__ = [
+    'Operator',
+    'OperatorRegistry',
+    'operator_registry',
+    'numpy_equivalent',
+    'is_commutative',
+    'protected_divide',
+    'protected_log',
+    'protected_sqrt',
+]
+
+
+def protected_divide(a, b):
+    """Division returning 1 where the divisor is (almost) zero"""
+    with np.errstate(all='ignore'):
+        return np.where(np.abs(b) > 1e-12, np.divide(a, b), 1.0)
+
+
+def protected_log(a):
+    """Logarithm of the absolute value, 0 in 0"""
+    with np.errstate(all='ignore'):
+        return np.where(a != 0, np.log(np.abs(a)), 0.0)
+
+
+def protected_sqrt(a):
+    """Square root of the absolute value"""
+    return np.sqrt(np.abs(a))
+
+
+_NUMPY_EQUIVALENTS = {
+    operator.add: np.add,
+    operator.sub: np.subtract,
+    operator.mul: np.multiply,
+    operator.truediv: np.divide,
+    operator.pow: np.power,
+    operator.neg: np.negative,
+    operator.abs: np.absolute,
+    abs: np.absolute,
+    math.sin: np.sin,
+    math.cos: np.cos,
+    math.tan: np.tan,
+    math.tanh: np.tanh,
+    math.exp: np.exp,
+    math.log: np.log,
+    math.sqrt: np.sqrt,
+}
+
+_PROTECTED = {
+    np.divide: protected_divide,
+    np.log: protected_log,
+    np.sqrt: protected_sqrt,
+}
+
+_COMMUTATIVE = (np.add, np.multiply, np.maximum, np.minimum, np.fmax, np.fmin, np.hypot)
+
+
+class Operator:
+    """Metadata of an operator, computed once when it is registered
+
+    `call` and `vcall` evaluate the scalar and the vectorized implementation, respectively, ignoring the
+    keyword arguments (i.e., the variables) that `EvalContext` passes to every node."""
+
+    __slots__ = ('id', 'func', 'name', 'arity', 'vectorized', 'protected', 'commutative', 'call', 'vcall')
+
+    def __init__(self, id: int, func: Callable, *, name=None, vectorized=None, protected=None, commutative=None):
+        self.id = id
+        self.func = func
+        self.arity = arity(func)
+        if name is not None:
+            self.name = name
+        elif getattr(func, '__name__', '<lambda>') == '<lambda>':
+            self.name = 'λ'
+        else:
+            self.name = func.__name__
+        self.vectorized = vectorized if vectorized is not None else _NUMPY_EQUIVALENTS.get(func, func)
+        self.protected = protected if protected is not None else _PROTECTED.get(self.vectorized, self.vectorized)
+        self.commutative = commutative if commutative is not None else self.vectorized in _COMMUTATIVE
+
+        def call(*args, **_kwargs):
+            return func(*args)
+
+        vectorized = self.vectorized
+
+        def vcall(*args, **_kwargs):
+            return vectorized(*args)
+
+        self.call = call
+        self.vcall = vcall
+
+    def __repr__(self):
+        return f'Operator({self.id}, {self.name}/{self.arity})'
+
+
+class OperatorRegistry:
+    """Map callables to `Operator`s with a compact integer id
+
+    Unknown callables are registered on first use, thus introspection is performed once per operator,
+    not once per node. Ids depend on the order of registration and are local to the process."""
+
+    def __init__(self):
+        self._operators = list()
+        self._ids = dict()
+
+    def __len__(self):
+        return len(self._operators)
+
+    def __getitem__(self, id: int) -> Operator:
+        return self._operators[id]
+
+    def __contains__(self, func: Callable):
+        return func in self._ids
+
+    def register(self, func: Callable, **kwargs) -> Operator:
+        """Register `func`, optionally overriding `name`, `vectorized`, `protected` and `commutative`"""
+        assert func not in self._ids, f"Panic: Operator {func} already registered"
+        op = Operator(len(self._operators), func, **kwargs)
+        self._operators.append(op)
+        self._ids[func] = op.id
+        return op
+
+    def get(self, func: Callable) -> Operator:
+        try:
+            return self._operators[self._ids[func]]
+        except KeyError:
+            return self.register(func)
+
+    def id(self, func: Callable) -> int:
+        return self.get(func).id
+
+
+# NumPy ufuncs and protected variants get the same ids in every process
+operator_registry = OperatorRegistry()
+for _f in (*_COMMUTATIVE, *_NUMPY_EQUIVALENTS.values(), *_PROTECTED.values()):
+    if _f not in operator_registry:
+        operator_registry.register(_f)
+
+
+def numpy_equivalent(f: Callable) -> Callable:
+    """Return the NumPy implementation equivalent to `f`, or `f` itself if none is known"""
+    try:
+        return operator_registry.get(f).vectorized
+    except TypeError:
+        # unhashable callable
+        return f
+
+
+def is_commutative(f: Callable) -> bool:
+    """Return True if the order of the arguments of `f` is known to be irrelevant"""
+    try:
+        return operator_registry.get(f).commutative
+    except TypeError:
+        return False
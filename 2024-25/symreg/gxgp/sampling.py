@@ -0,0 +1,91 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from .random import gxgp_random
+
+__all__ = ['load_problem', 'MiniBatchSampler']
+
+
+def load_problem(path: str, *, mmap: bool = True, cache_dir: str = None):
+    """Load `x` and `y` from a npz problem, returning X with one row per sample (as `DagGP.evaluate`)
+
+    NumPy can't memory-map arrays inside a npz archive: with `mmap`, they are extracted once as plain
+    .npy files in `cache_dir` (default: the system temp directory) and mapped read-only from there."""
+    if not mmap:
+        with np.load(path) as problem:
+            return problem['x'].T, problem['y']
+
+    stat = os.stat(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'gxgp')
+    os.makedirs(cache_dir, exist_ok=True)
+    prefix = os.path.join(cache_dir, f'{os.path.basename(path)}.{stat.st_size}.{stat.st_mtime_ns}')
+    arrays = dict()
+    for key in ('x', 'y'):
+        npy = f'{prefix}.{key}.npy'
+        if not os.path.exists(npy):
+            with np.load(path) as problem:
+                np.save(npy + '.tmp.npy', problem[key])
+            os.replace(npy + '.tmp.npy', npy)
+        arrays[key] = np.load(npy, mmap_mode='r')
+    return arrays['x'].T, arrays['y']
+
+
+class MiniBatchSampler:
+    """Schedule of the rows used for evaluating the population in each generation
+
+    With `interleaved`, generation g uses rows g, g+k, g+2k... (k = n_rows // batch_size), thus every row is
+    used once every k generations and batches are strided views, not copies. Otherwise rows are shuffled
+    once and consecutive blocks are used in turn. Every `rescore_every` generations, the `n_elites` best
+    individuals are re-scored on the full data set."""
+
+    def __init__(
+        self,
+        n_rows: int,
+        batch_size: int,
+        *,
+        interleaved: bool = True,
+        rescore_every: int = 5,
+        n_elites: int = 5,
+        rng=gxgp_random,
+    ):
+        assert 0 < batch_size <= n_rows, "Panic: Invalid batch size"
+        self._n_rows = n_rows
+        self._n_batches = max(1, n_rows // batch_size)
+        self._interleaved = interleaved
+        self.rescore_every = rescore_every
+        self.n_elites = n_elites
+        if not interleaved:
+            permutation = np.random.default_rng(rng.getrandbits(64)).permutation(n_rows)
+            size = math.ceil(n_rows / self._n_batches)
+            self._blocks = [np.sort(permutation[i : i + size]) for i in range(0, n_rows, size)]
+
+    @property
+    def n_batches(self):
+        return self._n_batches
+
+    def rows(self, generation: int) -> slice | np.ndarray:
+        if self._interleaved:
+            return slice(generation % self._n_batches, None, self._n_batches)
+        return self._blocks[generation % len(self._blocks)]
+
+    def batch(self, X, y, generation: int):
+        rows = self.rows(generation)
+        return X[rows], y[rows]
+
+    def same_batch(self, generation1: int, generation2: int) -> bool:
+        """Return True if the two generations use the very same rows"""
+        n_batches = self._n_batches if self._interleaved else len(self._blocks)
+        return generation1 % n_batches == generation2 % n_batches
+
+    def rescore(self, generation: int) -> bool:
+        return (generation + 1) % self.rescore_every == 0
@@ -0,0 +1,116 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+from typing import Callable, Collection, Iterable
+
+import numpy as np
+
+from .gp_common import random_path
+from .node import Node
+from .random import gxgp_random
+
+__all__ = ['Semantics', 'semantic_xover', 'semantic_mutation']
+
+
+class Semantics:
+    """Output vectors ("semantics") of nodes on a data set, lazily cached on the nodes themselves
+
+    Nodes are immutable and path copying creates new nodes only along the modified path, thus computing the
+    semantics of an offspring evaluates only the changed path, reusing the vectors cached on the shared
+    subtrees. Caches are tagged with the data set, a different `Semantics` never reuses them."""
+
+    def __init__(self, X, variables: int | Collection, *, decimals: int = 9):
+        if isinstance(variables, int):
+            names = [f'x{i}' for i in range(variables)]
+        else:
+            names = list(variables)
+        self._columns = dict(zip(names, np.ascontiguousarray(np.asarray(X, dtype=np.float64).T)))
+        self._n_samples = len(X)
+        self._decimals = decimals
+        self._tag = object()
+        self.computed = 0
+        self.reused = 0
+
+    def __call__(self, node: Node) -> np.ndarray:
+        """Return the output of `node` on every sample"""
+        return np.broadcast_to(self._semantics(node), (self._n_samples,))
+
+    def _semantics(self, node: Node):
+        if node._semantics is not None and node._semantics[0] is self._tag:
+            self.reused += 1
+            return node._semantics[1]
+        self.computed += 1
+        with np.errstate(all='ignore'):
+            value = node._vfunc(*[self._semantics(c) for c in node._successors], **self._columns)
+        node._semantics = (self._tag, value)
+        return value
+
+    def key(self, node: Node) -> int:
+        """Hash of the (rounded) semantics: semantically equivalent individuals have the same key"""
+        return hash(np.round(self(node), self._decimals).tobytes())
+
+    def distance(self, node1: Node, node2: Node) -> float:
+        """Mean absolute difference between the outputs of the two nodes"""
+        with np.errstate(all='ignore'):
+            return float(np.mean(np.abs(self(node1) - self(node2))))
+
+    def mse(self, node: Node, y) -> float:
+        with np.errstate(all='ignore'):
+            value = float(np.mean(np.square(np.asarray(y) - self(node))))
+        return value if np.isfinite(value) else np.inf
+
+    def drop_duplicates(self, offspring: Iterable[Node], population: Iterable[Node] = ()) -> list[Node]:
+        """Return the offspring that are semantically different from each other and from the population"""
+        seen = {self.key(i) for i in population}
+        unique = list()
+        for individual in offspring:
+            key = self.key(individual)
+            if key not in seen:
+                seen.add(key)
+                unique.append(individual)
+        return unique
+
+
+def semantic_xover(
+    tree1: Node,
+    tree2: Node,
+    semantics: Semantics,
+    *,
+    lower: float = 1e-4,
+    upper: float = 0.4,
+    trials: int = 12,
+    rng=gxgp_random,
+) -> Node:
+    """Semantic Similarity-based Crossover (Uy et al., 2011)
+
+    Swap subtrees whose semantic distance is in [lower, upper]: different enough to change the behaviour,
+    similar enough not to disrupt it. After `trials` failed attempts, the last pair is swapped anyway."""
+    for _ in range(trials):
+        path = random_path(tree1, rng=rng, include_root=False)
+        donor = tree2.get(random_path(tree2, rng=rng))
+        if lower <= semantics.distance(tree1.get(path), donor) <= upper:
+            break
+    return tree1.replace(path, donor)
+
+
+def semantic_mutation(
+    tree: Node,
+    new_subtree: Callable[[], Node],
+    semantics: Semantics,
+    *,
+    lower: float = 1e-4,
+    upper: float = 0.4,
+    trials: int = 12,
+    rng=gxgp_random,
+) -> Node:
+    """Semantic Similarity-based Mutation: replace a random subtree with a new, semantically similar one"""
+    path = random_path(tree, rng=rng, include_root=False)
+    old = tree.get(path)
+    for _ in range(trials):
+        candidate = new_subtree()
+        if lower <= semantics.distance(old, candidate) <= upper:
+            break
+    return tree.replace(path, candidate)
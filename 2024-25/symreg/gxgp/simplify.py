@@ -0,0 +1,166 @@
+#   *        Giovanni Squillero's GP Toolbox
+#  / \       ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# 2   +      A no-nonsense GP in pure Python
+#    / \
+#  10   11   Distributed under MIT License
+
+import numbers
+import time
+from typing import Callable
+
+import numpy as np
+
+from .intervals import VALID, IntervalScreen
+from .node import Node
+from .registry import numpy_equivalent
+
+__all__ = ['Simplifier', 'simplify']
+
+
+def _is_constant(node: Node, value=None) -> bool:
+    if node._op is not None or isinstance(node._value, str):
+        return False
+    return value is None or node._value == value
+
+
+def _same(node1: Node, node2: Node) -> bool:
+    return node1 is node2 or node1.structural_key == node2.structural_key
+
+
+class Simplifier:
+    """Fold constant subtrees and apply simple algebraic identities (x+0, x*1, x-x, ...)
+
+    The result is an equivalent, smaller expression; untouched subtrees are shared with the original.
+    Under NumPy semantics x-x, x*0 and x/x are not identities (e.g., inf-inf and 0/0 are NaN): they are
+    applied only where a `screen` proves x finite (and non-zero, for x/x) for all the inputs inside its
+    bounds, or everywhere with `unsafe`. Counters accumulate the (tree-expanded) sizes before and after
+    simplification and, when measured, the time needed to evaluate the expressions (see `measure`)."""
+
+    def __init__(self, *, screen: IntervalScreen = None, unsafe: bool = False, timing_sample: int = 10):
+        self._screen = screen
+        self._unsafe = unsafe
+        self.timing_sample = timing_sample
+        self.calls = 0
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.time_before = 0.0
+        self.time_after = 0.0
+
+    def __str__(self):
+        return (
+            f'Simplifier(calls={self.calls}, nodes={self.nodes_before}->{self.nodes_after}, '
+            + f'reduction={self.reduction:.2%})'
+        )
+
+    @property
+    def reduction(self):
+        """Fraction of nodes removed so far"""
+        return 1 - self.nodes_after / self.nodes_before if self.nodes_before else 0.0
+
+    @property
+    def time_reduction(self):
+        """Fraction of evaluation time saved on the measured expressions"""
+        return 1 - self.time_after / self.time_before if self.time_before else 0.0
+
+    def measure(self, originals: list[Node], simplified: list[Node], evaluate: Callable) -> tuple[float, float]:
+        """Time `evaluate` on (at most `timing_sample`) expressions before and after their simplification"""
+        before, after = 0.0, 0.0
+        for original, result in list(zip(originals, simplified))[: self.timing_sample]:
+            start = time.perf_counter()
+            evaluate(original)
+            before += time.perf_counter() - start
+            start = time.perf_counter()
+            evaluate(result)
+            after += time.perf_counter() - start
+        self.time_before += before
+        self.time_after += after
+        return before, after
+
+    def __call__(self, node: Node) -> Node:
+        result = self._simplify(node, dict())
+        self.calls += 1
+        self.nodes_before += len(node)
+        self.nodes_after += len(result)
+        return result
+
+    def _simplify(self, node: Node, memo: dict) -> Node:
+        if id(node) in memo:
+            return memo[id(node)]
+        if node.is_leaf:
+            return node
+        successors = [self._simplify(c, memo) for c in node._successors]
+        if all(_is_constant(c) for c in successors):
+            result = Simplifier._fold(node, successors)
+        else:
+            result = self._rewrite(numpy_equivalent(node._op), successors)
+        if result is None:
+            if all(s is c for s, c in zip(successors, node._successors)):
+                result = node
+            else:
+                result = node._with_successors(successors)
+        memo[id(node)] = result
+        return result
+
+    @staticmethod
+    def _fold(node: Node, successors: list[Node]) -> Node | None:
+        with np.errstate(all='ignore'):
+            try:
+                value = node._vfunc(*[c._value for c in successors])
+            except (ArithmeticError, ValueError):
+                return None
+        if not isinstance(value, numbers.Number) or not np.isfinite(value):
+            # e.g., 1/0 stays as it is
+            return None
+        return Node(float(value))
+
+    def _finite(self, node: Node, nonzero: bool = False) -> bool:
+        """Return True if `node` is proven finite (and non-zero) on every input"""
+        if self._unsafe:
+            return True
+        if self._screen is None or self._screen.status(node) != VALID:
+            return False
+        lower, upper = self._screen.interval(node)
+        return not nonzero or lower > 0 or upper < 0
+
+    def _rewrite(self, op, successors: list[Node]) -> Node | None:
+        if op is np.add:
+            a, b = successors
+            if _is_constant(a, 0):
+                return b
+            if _is_constant(b, 0):
+                return a
+        elif op is np.subtract:
+            a, b = successors
+            if _is_constant(b, 0):
+                return a
+            if _same(a, b) and self._finite(a):
+                return Node(0.0)
+        elif op is np.multiply:
+            a, b = successors
+            if _is_constant(a, 1):
+                return b
+            if _is_constant(b, 1):
+                return a
+            if (_is_constant(a, 0) and self._finite(b)) or (_is_constant(b, 0) and self._finite(a)):
+                return Node(0.0)
+        elif op is np.divide:
+            a, b = successors
+            if _is_constant(b, 1):
+                return a
+            if _same(a, b) and self._finite(a, nonzero=True):
+                return Node(1.0)
+        elif op is np.power:
+            a, b = successors
+            if _is_constant(b, 1):
+                return a
+            if _is_constant(b, 0):
+                return Node(1.0)
+        elif op is np.negative:
+            (a,) = successors
+            if a._op is not None and numpy_equivalent(a._op) is np.negative:
+                return a._successors[0]
+        return None
+
+
+def simplify(node: Node) -> Node:
+    return Simplifier()(node)
@@ -7,12 +7,17 @@
 import inspect
 from typing import Callable
 
+import numpy as np
+
 __all__ = ['arity']
 
 
 def arity(f: Callable) -> int:
     """Return the number of expected parameter or None if variable"""
-    if inspect.getfullargspec(f).varargs is not None:
+    if isinstance(f, np.ufunc):
+        return f.nin
+    spec = inspect.getfullargspec(f)
+    if spec.varargs is not None:
         return None
     else:
-        return len(inspect.getfullargspec(f).args)
+        return len(spec.args)
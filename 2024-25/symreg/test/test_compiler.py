@@ -0,0 +1,14 @@
+import numpy as np
+
+from gxgp import Node, compile_individual, protected_divide, protected_log
+
+X0 = Node('x0')
+
+
+def test_protected_operators():
+    individual = Node(np.log, [Node(np.divide, [X0, Node(0.0)])])
+    x = np.array([[-2.0, 0.0, 3.0]])
+    expected = protected_log(protected_divide(x[0], 0.0))
+    assert np.array_equal(compile_individual(individual, 1, protected=True)(x), expected)
+    with np.errstate(all='ignore'):
+        assert not np.isfinite(compile_individual(individual, 1)(x)).any()
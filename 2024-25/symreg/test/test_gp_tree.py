@@ -0,0 +1,18 @@
+import numpy as np
+
+from gxgp import MiniBatchSampler, Node, TreeGP
+
+X = np.random.default_rng(0).uniform(-3, 3, (500, 2))
+Y = X[:, 0] ** 2 + X[:, 1]
+
+
+def test_mini_batches_without_generations():
+    gp = TreeGP([np.add, np.multiply], 2, [1.0])
+    sampler = MiniBatchSampler(len(X), 50)
+    assert isinstance(gp.evolve(X, Y, population_size=20, generations=0, sampler=sampler), Node)
+
+
+def test_mini_batches_without_finite_full_fitness():
+    gp = TreeGP([np.add, np.multiply], 2, [1.0])
+    sampler = MiniBatchSampler(len(X), 50)
+    assert isinstance(gp.evolve(X, Y + np.inf, population_size=20, generations=2, sampler=sampler), Node)
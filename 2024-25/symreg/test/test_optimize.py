@@ -0,0 +1,28 @@
+import numpy as np
+
+from gxgp import ConstantOptimizer, Node
+
+
+def _individual():
+    return Node(np.add, [Node(np.multiply, [Node(2.0), Node('x0')]), Node(1.0)])
+
+
+def test_same_data_is_cached():
+    X = np.linspace(-1, 1, 50)[:, None]
+    y = 3 * X[:, 0] + 5
+    optimizer = ConstantOptimizer(1)
+    first = optimizer(_individual(), X, y)
+    second = optimizer(_individual(), X, y.copy())
+    assert second is first
+    assert optimizer.optimizations == 1 and optimizer.cache_hits == 1
+
+
+def test_different_targets_are_optimized_again():
+    X = np.linspace(-1, 1, 50)[:, None]
+    optimizer = ConstantOptimizer(1)
+    for a, b in ((3, 5), (-7, 100)):
+        y = a * X[:, 0] + b
+        optimized, mse = optimizer(_individual(), X, y)
+        assert mse < 1e-12
+        assert np.allclose(optimized.vectorized(x0=X[:, 0]), y)
+    assert optimizer.optimizations == 2 and optimizer.cache_hits == 0
@@ -0,0 +1,19 @@
+import numpy as np
+
+from gxgp import IntervalScreen, Node, Simplifier, simplify
+
+X0 = Node('x0')
+
+
+def test_unproven_identities_are_kept():
+    for op, other in ((np.subtract, X0), (np.multiply, Node(0.0)), (np.divide, X0)):
+        expression = Node(op, [X0, other])
+        assert simplify(expression) is expression
+
+
+def test_identities_proven_by_the_screen():
+    screen = IntervalScreen(np.array([[1.0], [2.0]]), ['x0'])
+    assert str(Simplifier(screen=screen)(Node(np.subtract, [X0, X0]))) == '0'
+    assert str(Simplifier(screen=screen)(Node(np.divide, [X0, X0]))) == '1'
+    screen = IntervalScreen(np.array([[-1.0], [2.0]]), ['x0'])
+    assert str(Simplifier(screen=screen)(Node(np.divide, [X0, X0]))) == 'divide(x0, x0)'
@@ -7,39 +7,115 @@ from collections import Counter
 
 
 class PriorityQueue:
-    """A basic Priority Queue with simple performance optimizations"""
+    """A basic Priority Queue with simple performance optimizations
+
+    Priorities can be changed with `update` (e.g., when a cheaper path is found): the old heap entry is
+    just marked as stale and skipped when popped, the heap is compacted when stale entries dominate."""
+
+    _STALE = 0
+    _LIVE = 1
 
     def __init__(self):
         self._data_heap = list()
-        self._data_set = set()
+        self._entries = dict()
+        self._stale = 0
 
     def __bool__(self):
-        return bool(self._data_set)
+        return bool(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
 
     def __contains__(self, item):
-        return item in self._data_set
+        return item in self._entries
 
     def push(self, item, p=None):
         assert item not in self, f"Duplicated element"
         if p is None:
-            p = len(self._data_set)
-        self._data_set.add(item)
-        heapq.heappush(self._data_heap, (p, item))
+            p = len(self._entries)
+        entry = [p, item, PriorityQueue._LIVE]
+        self._entries[item] = entry
+        heapq.heappush(self._data_heap, entry)
+
+    def push_many(self, items, priorities=None):
+        """Push all `items` at once (with the corresponding `priorities`), heapifying only once"""
+        items = list(items)
+        if priorities is None:
+            priorities = range(len(self._entries), len(self._entries) + len(items))
+        new_entries = list()
+        for item, p in zip(items, priorities):
+            assert item not in self, f"Duplicated element"
+            entry = [p, item, PriorityQueue._LIVE]
+            self._entries[item] = entry
+            new_entries.append(entry)
+        if len(new_entries) < len(self._data_heap) // 4:
+            for entry in new_entries:
+                heapq.heappush(self._data_heap, entry)
+        else:
+            self._data_heap.extend(new_entries)
+            heapq.heapify(self._data_heap)
+
+    def update(self, item, p):
+        """Change the priority of `item`, or push it if not already in the queue"""
+        if item in self._entries:
+            self._invalidate(self._entries.pop(item))
+        self.push(item, p)
+
+    def remove(self, item):
+        assert item in self, f"Item not in queue"
+        self._invalidate(self._entries.pop(item))
+
+    def priority(self, item):
+        return self._entries[item][0]
+
+    def peek(self):
+        self._drop_stale()
+        return self._data_heap[0][1]
 
     def pop(self):
-        p, item = heapq.heappop(self._data_heap)
-        self._data_set.remove(item)
+        self._drop_stale()
+        p, item, _ = heapq.heappop(self._data_heap)
+        del self._entries[item]
         return item
 
+    def _invalidate(self, entry):
+        entry[2] = PriorityQueue._STALE
+        self._stale += 1
+        if self._stale > 64 and self._stale > len(self._entries):
+            self._data_heap = [e for e in self._data_heap if e[2] == PriorityQueue._LIVE]
+            heapq.heapify(self._data_heap)
+            self._stale = 0
+
+    def _drop_stale(self):
+        while self._data_heap and self._data_heap[0][2] == PriorityQueue._STALE:
+            heapq.heappop(self._data_heap)
+            self._stale -= 1
+
 
 class Multiset:
-    """Multiset"""
+    """Multiset
+
+    The total number of elements and the sorted list of distinct elements are cached, the latter is
+    invalidated only when an element appears or disappears."""
 
     def __init__(self, init=None):
         self._data = Counter()
-        if init:
+        self._len = 0
+        self._sorted = None
+        if isinstance(init, Multiset):
+            self._data.update(init._data)
+            self._len = init._len
+            self._sorted = init._sorted
+        elif init:
             for item in init:
-                self.add(item)
+                Multiset.add(self, item)
+
+    @classmethod
+    def _from_counter(cls, data: Counter):
+        t = Multiset()
+        t._data = data
+        t._len = sum(data.values())
+        return cls(t) if cls is not Multiset else t
 
     def __contains__(self, item):
         return item in self._data and self._data[item] > 0
@@ -48,14 +124,16 @@ class Multiset:
         return self.count(item)
 
     def __iter__(self):
-        return (i for i in sorted(self._data.keys()) for _ in range(self._data[i]))
+        return (i for i in self._keys() for _ in range(self._data[i]))
 
     def __len__(self):
-        return sum(self._data.values())
+        return self._len
 
     def __copy__(self):
         t = Multiset()
         t._data = self._data.copy()
+        t._len = self._len
+        t._sorted = self._sorted
         return t
 
     def __str__(self):
@@ -65,10 +143,11 @@ class Multiset:
         return str(self)
 
     def __or__(self, other: "Multiset"):
-        tmp = Multiset()
-        for i in set(self._data.keys()) | set(other._data.keys()):
-            tmp.add(i, cnt=max(self[i], other[i]))
-        return tmp
+        data = self._data.copy()
+        for i, n in other._data.items():
+            if n > data[i]:
+                data[i] = n
+        return type(self)._from_counter(data)
 
     def __and__(self, other: "Multiset"):
         return self.intersection(other)
@@ -80,19 +159,23 @@ class Multiset:
         tmp = Multiset(self)
         for i, n in other._data.items():
             tmp.remove(i, cnt=n)
-        return tmp
+        return type(self)(tmp) if type(self) is not Multiset else tmp
 
     def __eq__(self, other: "Multiset"):
-        return list(self) == list(other)
+        if not isinstance(other, Multiset):
+            return list(self) == list(other)
+        return self._len == other._len and self._data == other._data
 
     def __le__(self, other: "Multiset"):
+        if self._len > other._len:
+            return False
         for i, n in self._data.items():
             if other.count(i) < n:
                 return False
         return True
 
     def __lt__(self, other: "Multiset"):
-        return self <= other and not self == other
+        return self._len < other._len and self <= other
 
     def __ge__(self, other: "Multiset"):
         return other <= self
@@ -103,25 +186,59 @@ class Multiset:
     def add(self, item, *, cnt=1):
         assert cnt >= 0, "Can't add a negative number of elements"
         if cnt > 0:
+            if item not in self._data:
+                self._sorted = None
             self._data[item] += cnt
+            self._len += cnt
 
     def remove(self, item, *, cnt=1):
         assert item in self, f"Item not in collection"
-        self._data[item] -= cnt
-        if self._data[item] <= 0:
+        if self._data[item] <= cnt:
+            self._len -= self._data[item]
             del self._data[item]
+            self._sorted = None
+        else:
+            self._data[item] -= cnt
+            self._len -= cnt
 
     def count(self, item):
         return self._data[item] if item in self._data else 0
 
     def union(self, other: "Multiset"):
-        t = Multiset(self)
-        for i in other._data.keys():
-            t.add(i, cnt=other[i])
-        return t
+        return type(self)._from_counter(self._data + other._data)
 
     def intersection(self, other: "Multiset"):
-        t = Multiset()
-        for i in self._data.keys():
-            t.add(i, cnt=min(self[i], other[i]))
-        return t
+        return type(self)._from_counter(self._data & other._data)
+
+    def freeze(self) -> "FrozenMultiset":
+        return FrozenMultiset(self)
+
+    def _keys(self):
+        if self._sorted is None:
+            self._sorted = sorted(self._data.keys())
+        return self._sorted
+
+
+class FrozenMultiset(Multiset):
+    """Immutable Multiset with a precomputed hash, usable as a dict key or in a set"""
+
+    def __init__(self, init=None):
+        super().__init__(init)
+        self._hash = hash(frozenset(self._data.items()))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other: "Multiset"):
+        if isinstance(other, FrozenMultiset) and self._hash != other._hash:
+            return False
+        return super().__eq__(other)
+
+    def __copy__(self):
+        return self
+
+    def add(self, item, *, cnt=1):
+        raise TypeError("FrozenMultiset is immutable")
+
+    def remove(self, item, *, cnt=1):
+        raise TypeError("FrozenMultiset is immutable")
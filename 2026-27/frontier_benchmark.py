@@ -0,0 +1,105 @@
+# Copyright © 2026 Giovanni Squillero / Politecnico di Torino
+# https://github.com/squillero/computational-intelligence
+# Free under certain conditions — see the license for details.
+
+import argparse
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+
+from gx_utils import ConcurrentPriorityQueue, PriorityQueue
+
+
+class LockedPriorityQueue:
+    """gx_utils.PriorityQueue behind a single lock"""
+
+    def __init__(self):
+        self._queue = PriorityQueue()
+        self._lock = threading.Lock()
+
+    def push(self, item, p=None):
+        with self._lock:
+            self._queue.push(item, p)
+
+    def pop(self):
+        with self._lock:
+            return self._queue.pop()
+
+
+class StdlibPriorityQueue:
+    def __init__(self):
+        self._queue = queue.PriorityQueue()
+
+    def push(self, item, p=None):
+        self._queue.put((p, item))
+
+    def pop(self):
+        return self._queue.get_nowait()[1]
+
+
+def frontiers(n_threads: int):
+    n_shards = 4 * n_threads
+    return {
+        'locked': LockedPriorityQueue,
+        'stdlib': StdlibPriorityQueue,
+        'sharded': lambda: ConcurrentPriorityQueue(n_shards, choices=2),
+        'sharded-exact': lambda: ConcurrentPriorityQueue(n_shards, choices=n_shards),
+    }
+
+
+def benchmark(frontier, n_threads: int, n_items: int, n_operations: int) -> float:
+    """Return the number of pop+push pairs per second (hold model: the size of the frontier is constant)"""
+    for i in range(n_items):
+        frontier.push((-1, i), random.random())
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(t):
+        rng = random.Random(t)
+        barrier.wait()
+        for i in range(n_operations // n_threads):
+            frontier.pop()
+            frontier.push((t, i), rng.random())
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return n_operations / (time.perf_counter() - start)
+
+
+def main(args):
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    if gil:
+        logging.warning("The GIL is active: threads can't scale (use a free-threaded interpreter, eg. python3.14t)")
+    print(f"{'threads':>8}" + ''.join(f'{n:>15}' for n in frontiers(1)))
+    for n_threads in args.threads:
+        results = {n: benchmark(f(), n_threads, args.items, args.operations) for n, f in frontiers(n_threads).items()}
+        print(f'{n_threads:>8}' + ''.join(f'{v:>13,.0f}/s' for v in results.values()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S")
+    logging.getLogger().setLevel(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Throughput of shared priority queues vs. number of threads")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="increase log verbosity")
+    parser.add_argument(
+        "-d", "--debug", action="store_const", dest="verbose", const=2, help="log debug messages (same as -vv)"
+    )
+    parser.add_argument("--threads", type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument("--items", type=int, default=10_000, help="initial size of the frontier")
+    parser.add_argument("--operations", type=int, default=200_000, help="total pop+push pairs")
+    args = parser.parse_args()
+
+    if args.verbose == 1:
+        logging.getLogger().setLevel(level=logging.INFO)
+    elif args.verbose == 2:
+        logging.getLogger().setLevel(level=logging.DEBUG)
+
+    main(args)
@@ -0,0 +1,338 @@
+# Copyright © 2026 Giovanni Squillero / Politecnico di Torino
+# https://github.com/squillero/computational-intelligence
+# Free under certain conditions — see the license for details.
+
+import heapq
+import random
+import threading
+from collections import Counter
+
+
+class PriorityQueue:
+    """A basic Priority Queue with simple performance optimizations
+
+    Priorities can be changed with `update` (e.g., when a cheaper path is found): the old heap entry is
+    just marked as stale and skipped when popped, the heap is compacted when stale entries dominate."""
+
+    _STALE = 0
+    _LIVE = 1
+
+    def __init__(self):
+        self._data_heap = list()
+        self._entries = dict()
+        self._stale = 0
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def push(self, item, p=None):
+        assert item not in self, f"Duplicated element"
+        if p is None:
+            p = len(self._entries)
+        entry = [p, item, PriorityQueue._LIVE]
+        self._entries[item] = entry
+        heapq.heappush(self._data_heap, entry)
+
+    def push_many(self, items, priorities=None):
+        """Push all `items` at once (with the corresponding `priorities`), heapifying only once"""
+        items = list(items)
+        if priorities is None:
+            priorities = range(len(self._entries), len(self._entries) + len(items))
+        new_entries = list()
+        for item, p in zip(items, priorities):
+            assert item not in self, f"Duplicated element"
+            entry = [p, item, PriorityQueue._LIVE]
+            self._entries[item] = entry
+            new_entries.append(entry)
+        if len(new_entries) < len(self._data_heap) // 4:
+            for entry in new_entries:
+                heapq.heappush(self._data_heap, entry)
+        else:
+            self._data_heap.extend(new_entries)
+            heapq.heapify(self._data_heap)
+
+    def update(self, item, p):
+        """Change the priority of `item`, or push it if not already in the queue"""
+        if item in self._entries:
+            self._invalidate(self._entries.pop(item))
+        self.push(item, p)
+
+    def remove(self, item):
+        assert item in self, f"Item not in queue"
+        self._invalidate(self._entries.pop(item))
+
+    def priority(self, item):
+        return self._entries[item][0]
+
+    def peek(self):
+        self._drop_stale()
+        return self._data_heap[0][1]
+
+    def pop(self):
+        self._drop_stale()
+        p, item, _ = heapq.heappop(self._data_heap)
+        del self._entries[item]
+        return item
+
+    def _invalidate(self, entry):
+        entry[2] = PriorityQueue._STALE
+        self._stale += 1
+        if self._stale > 64 and self._stale > len(self._entries):
+            self._data_heap = [e for e in self._data_heap if e[2] == PriorityQueue._LIVE]
+            heapq.heapify(self._data_heap)
+            self._stale = 0
+
+    def _drop_stale(self):
+        while self._data_heap and self._data_heap[0][2] == PriorityQueue._STALE:
+            heapq.heappop(self._data_heap)
+            self._stale -= 1
+
+
+class ConcurrentPriorityQueue:
+    """A Priority Queue that can be shared by many threads (meant for free-threaded Python)
+
+    Items are spread over `n_shards` heaps, each one with its own lock, according to their hash. `pop` peeks
+    at `choices` random shards and pops from the one with the best top (the "MultiQueue" scheme): with
+    few choices threads seldom contend on the same lock, but the order is only approximate; with
+    `choices=n_shards` the order is exact when there is no concurrent activity."""
+
+    def __init__(self, n_shards: int = 8, *, choices: int = 2):
+        assert 1 <= choices <= n_shards, "Invalid number of choices"
+        self._shards = [_Shard() for _ in range(n_shards)]
+        self._choices = choices
+        self._local = threading.local()
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def __bool__(self):
+        return any(s.data_set for s in self._shards)
+
+    def __len__(self):
+        return sum(len(s.data_set) for s in self._shards)
+
+    def __contains__(self, item):
+        return item in self._shard(item).data_set
+
+    def push(self, item, p=None):
+        if p is None:
+            with self._counter_lock:
+                p = self._counter
+                self._counter += 1
+        shard = self._shard(item)
+        with shard.lock:
+            assert item not in shard.data_set, f"Duplicated element"
+            shard.data_set.add(item)
+            heapq.heappush(shard.data_heap, (p, item))
+
+    def pop(self):
+        """Remove and return an item with a good (not necessarily the best) priority"""
+        if self._choices < len(self._shards):
+            r, n = self._random().random, len(self._shards)
+            shards = [self._shards[int(r() * n)] for _ in range(self._choices)]
+        else:
+            shards = None
+        while True:
+            shard = _best_shard(shards) if shards else None
+            if shard is None:
+                # the sampled shards are all empty: look everywhere
+                shard = _best_shard(self._shards)
+                if shard is None:
+                    raise IndexError("pop from an empty priority queue")
+            with shard.lock:
+                if shard.data_heap:
+                    p, item = heapq.heappop(shard.data_heap)
+                    shard.data_set.remove(item)
+                    return item
+            # emptied by another thread in the meanwhile
+            shards = None
+
+    def _shard(self, item) -> "_Shard":
+        return self._shards[hash(item) % len(self._shards)]
+
+    def _random(self) -> random.Random:
+        # one generator per thread, not to contend on the lock of the global one
+        try:
+            return self._local.random
+        except AttributeError:
+            self._local.random = random.Random()
+            return self._local.random
+
+
+class _Shard:
+    __slots__ = ('data_heap', 'data_set', 'lock')
+
+    def __init__(self):
+        self.data_heap = list()
+        self.data_set = set()
+        self.lock = threading.Lock()
+
+
+def _best_shard(shards) -> _Shard | None:
+    """Return the shard with the best top, peeking without locking (the result may be stale)"""
+    best, best_p = None, None
+    for shard in shards:
+        try:
+            p = shard.data_heap[0][0]
+        except IndexError:
+            continue
+        if best is None or p < best_p:
+            best, best_p = shard, p
+    return best
+
+
+class Multiset:
+    """Multiset
+
+    The total number of elements and the sorted list of distinct elements are cached, the latter is
+    invalidated only when an element appears or disappears."""
+
+    def __init__(self, init=None):
+        self._data = Counter()
+        self._len = 0
+        self._sorted = None
+        if isinstance(init, Multiset):
+            self._data.update(init._data)
+            self._len = init._len
+            self._sorted = init._sorted
+        elif init:
+            for item in init:
+                Multiset.add(self, item)
+
+    @classmethod
+    def _from_counter(cls, data: Counter):
+        t = Multiset()
+        t._data = data
+        t._len = sum(data.values())
+        return cls(t) if cls is not Multiset else t
+
+    def __contains__(self, item):
+        return item in self._data and self._data[item] > 0
+
+    def __getitem__(self, item):
+        return self.count(item)
+
+    def __iter__(self):
+        return (i for i in self._keys() for _ in range(self._data[i]))
+
+    def __len__(self):
+        return self._len
+
+    def __copy__(self):
+        t = Multiset()
+        t._data = self._data.copy()
+        t._len = self._len
+        t._sorted = self._sorted
+        return t
+
+    def __str__(self):
+        return f"M{{{', '.join(repr(i) for i in self)}}}"
+
+    def __repr__(self):
+        return str(self)
+
+    def __or__(self, other: "Multiset"):
+        data = self._data.copy()
+        for i, n in other._data.items():
+            if n > data[i]:
+                data[i] = n
+        return type(self)._from_counter(data)
+
+    def __and__(self, other: "Multiset"):
+        return self.intersection(other)
+
+    def __add__(self, other: "Multiset"):
+        return self.union(other)
+
+    def __sub__(self, other: "Multiset"):
+        tmp = Multiset(self)
+        for i, n in other._data.items():
+            tmp.remove(i, cnt=n)
+        return type(self)(tmp) if type(self) is not Multiset else tmp
+
+    def __eq__(self, other: "Multiset"):
+        if not isinstance(other, Multiset):
+            return list(self) == list(other)
+        return self._len == other._len and self._data == other._data
+
+    def __le__(self, other: "Multiset"):
+        if self._len > other._len:
+            return False
+        for i, n in self._data.items():
+            if other.count(i) < n:
+                return False
+        return True
+
+    def __lt__(self, other: "Multiset"):
+        return self._len < other._len and self <= other
+
+    def __ge__(self, other: "Multiset"):
+        return other <= self
+
+    def __gt__(self, other: "Multiset"):
+        return other < self
+
+    def add(self, item, *, cnt=1):
+        assert cnt >= 0, "Can't add a negative number of elements"
+        if cnt > 0:
+            if item not in self._data:
+                self._sorted = None
+            self._data[item] += cnt
+            self._len += cnt
+
+    def remove(self, item, *, cnt=1):
+        assert item in self, f"Item not in collection"
+        if self._data[item] <= cnt:
+            self._len -= self._data[item]
+            del self._data[item]
+            self._sorted = None
+        else:
+            self._data[item] -= cnt
+            self._len -= cnt
+
+    def count(self, item):
+        return self._data[item] if item in self._data else 0
+
+    def union(self, other: "Multiset"):
+        return type(self)._from_counter(self._data + other._data)
+
+    def intersection(self, other: "Multiset"):
+        return type(self)._from_counter(self._data & other._data)
+
+    def freeze(self) -> "FrozenMultiset":
+        return FrozenMultiset(self)
+
+    def _keys(self):
+        if self._sorted is None:
+            self._sorted = sorted(self._data.keys())
+        return self._sorted
+
+
+class FrozenMultiset(Multiset):
+    """Immutable Multiset with a precomputed hash, usable as a dict key or in a set"""
+
+    def __init__(self, init=None):
+        super().__init__(init)
+        self._hash = hash(frozenset(self._data.items()))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other: "Multiset"):
+        if isinstance(other, FrozenMultiset) and self._hash != other._hash:
+            return False
+        return super().__eq__(other)
+
+    def __copy__(self):
+        return self
+
+    def add(self, item, *, cnt=1):
+        raise TypeError("FrozenMultiset is immutable")
+
+    def remove(self, item, *, cnt=1):
+        raise TypeError("FrozenMultiset is immutable")